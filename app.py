@@ -1,1003 +1,787 @@
-# HEAD
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import (
+    Blueprint, Flask, abort, current_app, g, render_template, request, jsonify, send_file
+)
+from flask.json.provider import DefaultJSONProvider
 import json
 import io
+import itertools
 from datetime import datetime
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-from reportlab.lib.colors import HexColor
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-
-# ─── Initialize Flask App ──────────────────────────────────────────────
-app = Flask(__name__)
-
-# Ensure upload folder exists
-os.makedirs('static/uploads', exist_ok=True)
-
-# ─── Study Plan Generation Logic ───────────────────────────────────────
-def generate_study_plan(current_score, target_score, hours_daily, test_type, num_weeks):
-    """
-    Generate a personalized weekly study plan
-    """
-    # Calculate intensity
-    score_gap = float(target_score) - float(current_score)
-    intensity = "High" if score_gap > 1.5 else "Medium" if score_gap > 0.5 else "Low"
-
-    # Base activities by skill
-    base_activities = {
-        'listening': [
-            'Practice with real IELTS listening tests',
-            'Focus on identifying key information and details',
-            'Listen to English podcasts and audio recordings'
-        ],
-        'reading': [
-            'Practice IELTS reading passages with time limits',
-            'Work on skimming and scanning techniques',
-            'Build academic vocabulary'
-        ],
-        'writing': [
-            'Practice Task 1 and Task 2 essay writing',
-            'Focus on structure and coherence',
-            'Build vocabulary for academic writing'
-        ],
-        'speaking': [
-            'Practice speaking on various topics',
-            'Record yourself and analyze fluency',
-            'Work on pronunciation and intonation'
-        ]
-    }
+import tempfile
+import time
+
+import config
+from fast_json import FastEncoder, fragments
+from pdf_batch import plan_pdf_name, render_plan_pdfs, write_pdf_zip
+from pdf_cache import PdfCache, pdf_cache_key
+from metrics import metrics, phase
+from pdf_jobs import JOB_DONE, JOB_FAILED, PdfJobQueue, QueueFull, create_job_store
+from plan_compact import compact_plan, expand_plan, wants_compact_plan
+from plan_index import open_plan_index
+from plan_model import as_plan_model
+from plan_patch import PLAN_PARAMS, regenerate_plan
+from plan_store import create_plan_store
+from profiler import create_request_profiler
+from planner import (
+    LazyPlan, build_day_template, current_timestamp, generate_study_plan, normalize_plan_inputs,
+    plan_cache
+)
+
+# Shared per-process state, used by every app create_app() builds
+
+# Generated plans are kept server-side so exports can refer to them by ID
+plan_store = create_plan_store(config.PLAN_STORE, config.PLAN_STORE_SIZE, config.PLAN_STORE_TTL)
+
+# Precomputed plan JSON for every form input (None: plans are built live)
+plan_index = open_plan_index(config.PLAN_INDEX_PATH)
+
+# Rendered PDFs keyed on the plan body hash (also served as the ETag)
+pdf_cache = PdfCache(config.PDF_CACHE_MAX_BYTES, config.PDF_CACHE_DIR)
+
+# Opt-in profiling of sampled or admin-flagged requests (None when off)
+request_profiler = create_request_profiler(
+    config.PROFILE_DIR, config.PROFILE_SAMPLE_RATE, config.PROFILE_ADMIN_TOKEN,
+    config.PROFILE_MAX_FILES, config.PROFILE_MODE, config.PROFILE_SAMPLE_INTERVAL
+)
+
+# Background PDF renders for /export-pdf?async=1
+pdf_jobs = PdfJobQueue(
+    create_job_store(config.PDF_JOB_STORE, config.PDF_JOB_STORE_SIZE, config.PDF_JOB_TTL),
+    pdf_cache,
+    config.PDF_JOB_MAX_PENDING
+)
+
+# Plan Export Rendering
+def iter_plan_text(plan_data):
+    """
+    Yield a study plan as plain text, one chunk for the header and one per week
 
-    # Weekly focus logic
-    def get_week_focus(week, total_weeks, score_gap):
-        if week <= total_weeks // 3:
-            return "Foundation Building"
-        elif week <= 2 * total_weeks // 3:
-            return "Skill Development"
-        else:
-            return "Test Preparation & Practice"
-
-    # Daily schedule generator
-    def generate_daily_schedule(hours_daily, test_type, intensity):
-        hours = int(hours_daily)
-        allocation = {'listening': 0.25, 'reading': 0.25, 'writing': 0.30, 'speaking': 0.20}
-        
-        daily_schedule = {}
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
-        for day in days:
-            schedule = []
-            for skill, ratio in allocation.items():
-                time_allocated = int(hours * ratio * 60)  # minutes
-                if time_allocated > 0:
-                    schedule.append({
-                        'skill': skill.title(),
-                        'duration': f"{time_allocated} minutes",
-                        'activities': get_skill_activities(skill, test_type, time_allocated)
-                    })
-            daily_schedule[day] = schedule
-        
-        return daily_schedule
-
-    def get_skill_activities(skill, test_type, duration_minutes):
-        activities = {
-            'listening': [
-                'Listen to IELTS practice tests',
-                'Practice with academic lectures' if test_type == 'academic' else 'Practice with everyday conversations',
-                'Focus on identifying main ideas and details'
-            ],
-            'reading': [
-                'Complete IELTS reading passages',
-                'Practice academic texts' if test_type == 'academic' else 'Practice general interest articles',
-                'Work on time management'
-            ],
-            'writing': [
-                'Practice Task 1 (graphs/charts)' if test_type == 'academic' else 'Practice Task 1 (letters)',
-                'Practice Task 2 essay writing',
-                'Focus on structure and linking words'
-            ],
-            'speaking': [
-                'Practice Part 1 personal questions',
-                'Work on Part 2 cue card topics',
-                'Practice Part 3 discussion questions'
-            ]
-        }
-        return activities.get(skill, [])
-
-    def get_weekly_goals(week, target_score):
-        return [
-            f"Maintain consistent daily study routine",
-            f"Complete all scheduled practice activities",
-            f"Track progress towards {target_score} target",
-            f"Review and identify areas for improvement"
-        ]
-
-    # Generate full plan
-    weekly_plan = {}
-    for week in range(1, num_weeks + 1):
-        weekly_plan[f'Week {week}'] = {
-            'focus': get_week_focus(week, num_weeks, score_gap),
-            'daily_schedule': generate_daily_schedule(hours_daily, test_type, intensity),
-            'goals': get_weekly_goals(week, target_score),
-            'resources': {
-                'sparkskytech': [
-                    'https://www.sparkskytech.com/ielts',
-                    'https://www.sparkskytech.com/ielts/ielts_free_resources'
-                ],
-                'official': [
-                    'https://www.ielts.org/',
-                    'https://takeielts.britishcouncil.org/'
-                ],
-                'practice': [
-                    'https://www.ieltsonlinetests.com/',
-                    'https://ieltsliz.com/'
-                ]
-            }
-        }
-
-    return {
-        'current_score': current_score,
-        'target_score': target_score,
-        'test_type': test_type,
-        'duration': f"{num_weeks} weeks",
-        'hours_daily': hours_daily,
-        'intensity': intensity,
-        'weekly_plan': weekly_plan,
-        'generated_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
+    plan_data may be a plan dict or a plan_model.Plan; each shared day
+    template is formatted once.
+    """
+    plan = as_plan_model(plan_data)
+
+    # Header and overview
+    yield (
+        "IELTS STUDY PLAN\n"
+        + "=" * 50 + "\n\n"
+        + f"Current Score: {plan.current_score}\n"
+        + f"Target Score: {plan.target_score}\n"
+        + f"Test Type: {plan.test_type.title()}\n"
+        + f"Duration: {plan.duration}\n"
+        + f"Daily Hours: {plan.hours_daily} hours\n"
+        + f"Generated: {plan.generated_date}\n\n"
+    )
+
+    # Weekly plans
+    slots_text = {}
+    for week in plan.weeks:
+        lines = [f"{week.name.upper()}\n", f"Focus: {week.focus}\n\n"]
+        for day in week.days:
+            text = slots_text.get(id(day.slots))
+            if text is None:
+                day_lines = []
+                for slot in day.slots:
+                    day_lines.append(f"    • {slot.skill}: {slot.duration}\n")
+                    if slot.activities is not None:
+                        for task in slot.activities:
+                            day_lines.append(f"      - {task}\n")
+                text = slots_text[id(day.slots)] = ''.join(day_lines)
+            lines.append(f"  {day.name}:\n")
+            lines.append(text)
+            lines.append("\n")
+        lines.append("-" * 30 + "\n\n")
+        yield ''.join(lines)
+
+
+def render_plan_text(plan_data):
+    """
+    Format a study plan as plain text
+    """
+    return ''.join(iter_plan_text(plan_data))
 
 
-# ─── Routes ────────────────────────────────────────────────────────────
+def send_plan_text(plan_data, download=False):
+    """
+    Stream a study plan as text/plain, week by week
 
-@app.route('/')
-def index():
-    """Serve the main HTML page"""
-    return render_template('index.html')
+    With download=True the response is marked as a file attachment. The
+    plan is converted and its header formatted before the response is
+    returned, so malformed plans fail with the caller's error response
+    rather than a truncated 200.
+    """
+    chunks = iter_plan_text(as_plan_model(plan_data))
+    header = next(chunks)
+    response = current_app.response_class(itertools.chain((header,), chunks),
+                                          mimetype='text/plain')
+    if download:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename="IELTS_StudyPlan_SparkSkyTech_{timestamp}.txt"'
+        )
+    return response
 
 
-@app.route('/generate-plan', methods=['POST'])
-def generate_plan():
-    """Generate study plan from form data"""
-    try:
-        # Get form data (support both slider and dropdown names)
-        current_score = request.form.get('current_score') or request.form.get('currentLevel')
-        target_score = request.form.get('target_score') or request.form.get('targetBand')
-        hours_daily = request.form.get('hours_daily') or request.form.get('hoursDaily')
-        test_type = request.form.get('test_type') or request.form.get('testType')
-        num_weeks_str = request.form.get('num_weeks') or request.form.get('prepDuration')
-
-        # Validate required fields
-        if not all([current_score, target_score, hours_daily, test_type, num_weeks_str]):
-            return jsonify({'success': False, 'error': 'Missing required fields'}), 400
+def load_plan(plan_id):
+    """
+    Return the stored plan as a plan dict, or None if it is unknown
+    """
+    plan = plan_store.get(plan_id)
+    if isinstance(plan, LazyPlan):
+        plan = plan.to_dict()
+    return plan
 
-        num_weeks = int(num_weeks_str)
 
-        # Generate the plan
-        study_plan = generate_study_plan(
-            current_score, target_score, hours_daily, test_type, num_weeks
-        )
+# Alternative (dropdown) field names for the planner inputs
+PLAN_PARAM_ALIASES = {
+    'current_score': 'currentLevel',
+    'target_score': 'targetBand',
+    'hours_daily': 'hoursDaily',
+    'test_type': 'testType',
+    'num_weeks': 'prepDuration'
+}
 
-        return jsonify({'success': True, 'plan': study_plan})
 
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+def read_plan_fields(data):
+    """
+    Read the planner inputs present in form data or a JSON object
 
+    Both the slider and the dropdown field names are accepted; missing or
+    empty fields are left out.
+    """
+    fields = {}
+    for name in PLAN_PARAMS:
+        value = data.get(name) or data.get(PLAN_PARAM_ALIASES[name])
+        if value:
+            fields[name] = value
+    return fields
 
-@app.route('/export-text', methods=['POST'])
-def export_text():
-    """Export study plan as plain text"""
-    try:
-        plan_data = request.get_json()
-        if not plan_data:
-            return jsonify({'success': False, 'error': 'No data received'}), 400
 
-        buffer = io.StringIO()
-
-        # Header
-        buffer.write("IELTS STUDY PLAN\n")
-        buffer.write("=" * 50 + "\n\n")
-
-        # Overview
-        buffer.write(f"Current Score: {plan_data['current_score']}\n")
-        buffer.write(f"Target Score: {plan_data['target_score']}\n")
-        buffer.write(f"Test Type: {plan_data['test_type'].title()}\n")
-        buffer.write(f"Duration: {plan_data['duration']}\n")
-        buffer.write(f"Daily Hours: {plan_data['hours_daily']} hours\n")
-        buffer.write(f"Generated: {plan_data['generated_date']}\n\n")
-
-        # Weekly plans
-        for week, details in plan_data['weekly_plan'].items():
-            buffer.write(f"{week.upper()}\n")
-            buffer.write(f"Focus: {details['focus']}\n\n")
-            for day, schedule in details['daily_schedule'].items():
-                buffer.write(f"  {day}:\n")
-                for activity in schedule:
-                    buffer.write(f"    • {activity['skill']}: {activity['duration']}\n")
-                    if 'activities' in activity:
-                        for task in activity['activities']:
-                            buffer.write(f"      - {task}\n")
-                buffer.write("\n")
-            buffer.write("-" * 30 + "\n\n")
-
-        content = buffer.getvalue()
-        buffer.close()
+def read_plan_params(data):
+    """
+    Read and validate planner inputs from form data or a JSON object
 
-        return jsonify({'success': True, 'content': content})
+    Returns (current_score, target_score, hours_daily, test_type,
+    num_weeks), or None if a required field is missing; a week count that
+    is not an integer raises ValueError.
+    """
+    fields = read_plan_fields(data)
 
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    # Validate required fields
+    if len(fields) != len(PLAN_PARAMS):
+        return None
 
+    current_score, target_score, hours_daily, test_type, num_weeks_str = (
+        fields[name] for name in PLAN_PARAMS
+    )
+    return current_score, target_score, hours_daily, test_type, int(num_weeks_str)
 
-@app.route('/export-pdf', methods=['POST'])
-def export_pdf():
-    """Export study plan as professional PDF with clickable footer and page numbers"""
-    try:
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.colors import HexColor
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT
-        
-        plan_data = request.get_json()
-        if not plan_data:
-            return jsonify({'error': 'No data provided'}), 400
 
-        buffer = io.BytesIO()
-        
-        # Custom Canvas for headers/footers
-        class ProfessionalCanvas(canvas.Canvas):
-            def __init__(self, *args, **kwargs):
-                canvas.Canvas.__init__(self, *args, **kwargs)
-                self._saved_page_states = []
-                self.page_count = 0
-
-            def showPage(self):
-                self._saved_page_states.append(dict(self.__dict__))
-                self._startPage()
-
-            def save(self):
-                num_pages = len(self._saved_page_states)
-                for (page_num, page_state) in enumerate(self._saved_page_states):
-                    self.__dict__.update(page_state)
-                    self.draw_page_elements(page_num + 1, num_pages)
-                    canvas.Canvas.showPage(self)
-                canvas.Canvas.save(self)
-
-            def draw_page_elements(self, page_num, total_pages):
-                # Header
-                self.setFont("Helvetica-Bold", 16)
-                self.setFillColor(HexColor("#667eea"))
-                self.drawCentredText(letter[0]/2, letter[1] - 50, "IELTS Smart Study Plan")
-                
-                # Subheader
-                self.setFont("Helvetica", 12)
-                self.setFillColor(HexColor("#764ba2"))
-                self.drawCentredText(letter[0]/2, letter[1] - 70, "by SparkSkyTech")
-                
-                # Page number (top right)
-                self.setFont("Helvetica", 10)
-                self.setFillColor(colors.gray)
-                self.drawRightString(letter[0] - 50, letter[1] - 50, f"Page {page_num} of {total_pages}")
-                
-                # Footer with clickable links
-                footer_y = 50
-                
-                # Company name
-                self.setFont("Helvetica-Bold", 11)
-                self.setFillColor(HexColor("#667eea"))
-                self.drawString(50, footer_y + 20, "SparkSkyTech - IELTS Study Plan Generator")
-                
-                # Website link (clickable)
-                self.setFont("Helvetica", 10)
-                self.setFillColor(colors.blue)
-                website_text = "Visit: www.sparkskytech.com/ielts"
-                self.drawString(50, footer_y, website_text)
-                
-                # Make website clickable
-                self.linkURL("https://www.sparkskytech.com/ielts", 
-                           (50, footer_y - 5, 200, footer_y + 10))
-                
-                # Generation date (right side)
-                self.setFont("Helvetica", 9)
-                self.setFillColor(colors.gray)
-                gen_date = f"Generated: {plan_data['generated_date']}"
-                self.drawRightString(letter[0] - 50, footer_y, gen_date)
-                
-                # Separator line
-                self.setStrokeColor(HexColor("#e2e8f0"))
-                self.setLineWidth(0.5)
-                self.line(50, letter[1] - 90, letter[0] - 50, letter[1] - 90)  # Top line
-                self.line(50, footer_y + 35, letter[0] - 50, footer_y + 35)   # Bottom line
-
-        # Create document with custom canvas
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            topMargin=120,  # More space for header
-            bottomMargin=100,  # More space for footer
-            leftMargin=60,
-            rightMargin=60
-        )
+def read_bulk_items():
+    """
+    Read the items of a bulk request: a JSON array, or NDJSON (one JSON
+    value per non-blank line)
 
-        # Enhanced Styles
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=HexColor("#667eea"),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        section_style = ParagraphStyle(
-            'SectionHeader',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=HexColor("#764ba2"),
-            spaceAfter=15,
-            spaceBefore=20,
-            fontName='Helvetica-Bold',
-            borderWidth=1,
-            borderColor=HexColor("#e2e8f0"),
-            borderPadding=8,
-            backColor=HexColor("#f8fafc")
-        )
-        
-        week_style = ParagraphStyle(
-            'WeekHeader',
-            parent=styles['Heading3'],
-            fontSize=14,
-            textColor=HexColor("#667eea"),
-            spaceAfter=12,
-            spaceBefore=15,
-            fontName='Helvetica-Bold'
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            leading=16,
-            fontName='Helvetica'
-        )
-        
-        bullet_style = ParagraphStyle(
-            'BulletStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            leading=14,
-            leftIndent=20,
-            fontName='Helvetica'
-        )
+    Lines that are not valid JSON are returned as ValueError instances so
+    they can be reported per item.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = []
+        for line in request.get_data(as_text=True).splitlines():
+            if line.strip():
+                try:
+                    items.append(json.loads(line))
+                except ValueError as e:
+                    items.append(ValueError(f"Invalid JSON: {e}"))
+        return items
+
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array or NDJSON of plan parameters")
+    return items
+
+
+def iter_bulk_plans(items, dumps, compact=False):
+    """
+    Generate, store and yield one NDJSON line per bulk item, encoded with
+    dumps (the app's JSON provider; the generator outlives the app context)
 
-        # Build content
-        content = []
-        
-        # Title Section
-        content.append(Paragraph("Your Personalized Study Plan", title_style))
-        content.append(Spacer(1, 20))
-
-        # Overview Table
-        overview_data = [
-            ['<b>Current Score:</b>', plan_data['current_score']],
-            ['<b>Target Score:</b>', plan_data['target_score']],
-            ['<b>Test Type:</b>', plan_data['test_type'].title()],
-            ['<b>Duration:</b>', plan_data['duration']],
-            ['<b>Daily Hours:</b>', f"{plan_data['hours_daily']} hours"],
-            ['<b>Intensity Level:</b>', plan_data['intensity']]
-        ]
-        
-        overview_table = Table(overview_data, colWidths=[2*inch, 3*inch])
-        overview_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor("#667eea")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('GRID', (0, 0), (-1, -1), 1, colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, HexColor("#f8fafc")])
-        ]))
-        
-        content.append(overview_table)
-        content.append(Spacer(1, 30))
-
-        # Weekly Plans
-        content.append(Paragraph("Weekly Study Schedule", section_style))
-        
-        for week_name, details in plan_data['weekly_plan'].items():
-            content.append(Paragraph(f"{week_name}", week_style))
-            content.append(Paragraph(f"<b>Focus:</b> {details['focus']}", normal_style))
-            content.append(Spacer(1, 10))
-            
-            # Daily schedule
-            for day, activities in details['daily_schedule'].items():
-                content.append(Paragraph(f"<b>{day}:</b>", normal_style))
-                
-                for activity in activities:
-                    activity_text = f"• <b>{activity['skill']}:</b> {activity['duration']}"
-                    content.append(Paragraph(activity_text, bullet_style))
-                    
-                    # Add specific activities if available
-                    if 'activities' in activity:
-                        for task in activity['activities'][:2]:  # Limit to 2 tasks for space
-                            task_text = f"  - {task}"
-                            content.append(Paragraph(task_text, bullet_style))
-                
-                content.append(Spacer(1, 8))
-            
-            # Weekly goals
-            if 'goals' in details and details['goals']:
-                content.append(Paragraph("<b>Weekly Goals:</b>", normal_style))
-                for goal in details['goals']:
-                    content.append(Paragraph(f"• {goal}", bullet_style))
-                
-            content.append(Spacer(1, 20))
-
-        # Resources Section
-        content.append(Paragraph("Recommended Resources", section_style))
-        
-        resources_text = f"""
-        <b>SparkSkyTech Resources:</b><br/>
-        • Comprehensive IELTS preparation materials<br/>
-        • Free practice tests and mock exams<br/>
-        • Expert strategies and tips<br/>
-        • Visit: <link href="https://www.sparkskytech.com/ielts">www.sparkskytech.com/ielts</link><br/><br/>
-        
-        <b>Official IELTS Resources:</b><br/>
-        • Official practice materials and sample tests<br/>
-        • Test format and scoring information<br/>
-        • Registration and test center details<br/><br/>
-        
-        <b>Additional Practice:</b><br/>
-        • British Council IELTS preparation courses<br/>
-        • Online mock tests and practice exercises<br/>
-        • Mobile apps for daily vocabulary building
-        """
-        
-        content.append(Paragraph(resources_text, normal_style))
-        
-        # Success tips
-        content.append(Spacer(1, 20))
-        content.append(Paragraph("Success Tips", week_style))
-        
-        tips_text = """
-        • <b>Consistency is key:</b> Study regularly even if for shorter periods<br/>
-        • <b>Track your progress:</b> Keep a study journal and note improvements<br/>
-        • <b>Practice under timed conditions:</b> Simulate real exam environment<br/>
-        • <b>Focus on weak areas:</b> Spend extra time on challenging skills<br/>
-        • <b>Use official materials:</b> Supplement with authentic IELTS content<br/>
-        • <b>Get feedback:</b> Have your writing and speaking assessed by experts
-        """
-        
-        content.append(Paragraph(tips_text, normal_style))
-
-        # Build PDF with custom canvas
-        doc.build(content, canvasmaker=ProfessionalCanvas)
-        buffer.seek(0)
-
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M')
-        filename = f"IELTS_StudyPlan_SparkSkyTech_{timestamp}.pdf"
+    A failing item yields an error line for its index; the batch goes on.
+    """
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not isinstance(item, dict):
+                raise ValueError("Each item must be a JSON object")
+            params = read_plan_params(item)
+            if params is None:
+                raise ValueError("Missing required fields")
+
+            study_plan = generate_study_plan(*params)
+            plan_id = plan_store.save(study_plan)
+            if compact:
+                study_plan = compact_plan(study_plan)
+            result = {'index': index, 'success': True, 'plan_id': plan_id, 'plan': study_plan}
+        except Exception as e:
+            result = {'index': index, 'success': False, 'error': str(e)}
+        yield dumps(result, separators=(',', ':')) + '\n'
+
+
+def send_indexed_plan(plan_json, plan_id):
+    """
+    Return the /generate-plan response around plan JSON from plan_index
 
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
-        )
+    The bytes are the same jsonify() would produce for the plan dict.
+    """
+    with phase('json_serialize'):
+        body = b''.join((b'{"plan":', plan_json, b',"plan_id":', json.dumps(plan_id).encode(),
+                         b',"success":true}\n'))
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
 
-    except Exception as e:
-        print("PDF Export Error:", str(e))
-        return jsonify({'error': str(e)}), 500
 
-@app.route('/health')
-def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+def get_page_args():
+    """
+    Read ?offset= and ?limit= for week pagination
+    """
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = request.args.get('limit', config.PLAN_PAGE_SIZE, type=int)
+    return offset, min(max(1, limit), config.PLAN_PAGE_MAX)
 
 
-from flask import Flask, render_template, request, jsonify, send_file
-import json
-import io
-from datetime import datetime
-import os
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-from reportlab.lib.colors import HexColor
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-
-# Initialize Flask App
-app = Flask(__name__)
-
-# Ensure upload folder exists
-os.makedirs('static/uploads', exist_ok=True)
-
-# Study Plan Generation Logic
-def generate_study_plan(current_score, target_score, hours_daily, test_type, num_weeks):
-    """
-    Generate a personalized weekly study plan
-    """
-    # Calculate intensity
-    score_gap = float(target_score) - float(current_score)
-    intensity = "High" if score_gap > 1.5 else "Medium" if score_gap > 0.5 else "Low"
-
-    # Base activities by skill
-    base_activities = {
-        'listening': [
-            'Practice with real IELTS listening tests',
-            'Focus on identifying key information and details',
-            'Listen to English podcasts and audio recordings'
-        ],
-        'reading': [
-            'Practice IELTS reading passages with time limits',
-            'Work on skimming and scanning techniques',
-            'Build academic vocabulary'
-        ],
-        'writing': [
-            'Practice Task 1 and Task 2 essay writing',
-            'Focus on structure and coherence',
-            'Build vocabulary for academic writing'
-        ],
-        'speaking': [
-            'Practice speaking on various topics',
-            'Record yourself and analyze fluency',
-            'Work on pronunciation and intonation'
-        ]
-    }
+def next_page_offset(offset, count, total):
+    """Offset of the next page of weeks, or None after the last page"""
+    return offset + count if offset + count < total else None
+
 
-    # Weekly focus logic
-    def get_week_focus(week, total_weeks, score_gap):
-        if week <= total_weeks // 3:
-            return "Foundation Building"
-        elif week <= 2 * total_weeks // 3:
-            return "Skill Development"
-        else:
-            return "Test Preparation & Practice"
-
-    # Daily schedule generator
-    def generate_daily_schedule(hours_daily, test_type, intensity):
-        hours = int(hours_daily)
-        allocation = {'listening': 0.25, 'reading': 0.25, 'writing': 0.30, 'speaking': 0.20}
-        
-        daily_schedule = {}
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
-        for day in days:
-            schedule = []
-            for skill, ratio in allocation.items():
-                time_allocated = int(hours * ratio * 60)  # minutes
-                if time_allocated > 0:
-                    schedule.append({
-                        'skill': skill.title(),
-                        'duration': f"{time_allocated} minutes",
-                        'activities': get_skill_activities(skill, test_type, time_allocated)
-                    })
-            daily_schedule[day] = schedule
-        
-        return daily_schedule
-
-    def get_skill_activities(skill, test_type, duration_minutes):
-        activities = {
-            'listening': [
-                'Listen to IELTS practice tests',
-                'Practice with academic lectures' if test_type == 'academic' else 'Practice with everyday conversations',
-                'Focus on identifying main ideas and details'
-            ],
-            'reading': [
-                'Complete IELTS reading passages',
-                'Practice academic texts' if test_type == 'academic' else 'Practice general interest articles',
-                'Work on time management'
-            ],
-            'writing': [
-                'Practice Task 1 (graphs/charts)' if test_type == 'academic' else 'Practice Task 1 (letters)',
-                'Practice Task 2 essay writing',
-                'Focus on structure and linking words'
-            ],
-            'speaking': [
-                'Practice Part 1 personal questions',
-                'Work on Part 2 cue card topics',
-                'Practice Part 3 discussion questions'
-            ]
-        }
-        return activities.get(skill, [])
-
-    def get_weekly_goals(week, target_score):
-        return [
-            f"Maintain consistent daily study routine",
-            f"Complete all scheduled practice activities",
-            f"Track progress towards {target_score} target",
-            f"Review and identify areas for improvement"
-        ]
-
-    # Generate full plan
-    weekly_plan = {}
-    for week in range(1, num_weeks + 1):
-        weekly_plan[f'Week {week}'] = {
-            'focus': get_week_focus(week, num_weeks, score_gap),
-            'daily_schedule': generate_daily_schedule(hours_daily, test_type, intensity),
-            'goals': get_weekly_goals(week, target_score),
-            'resources': {
-                'sparkskytech': [
-                    'https://www.sparkskytech.com/ielts',
-                    'https://www.sparkskytech.com/ielts/ielts_free_resources'
-                ],
-                'official': [
-                    'https://www.ielts.org/',
-                    'https://takeielts.britishcouncil.org/'
-                ],
-                'practice': [
-                    'https://www.ieltsonlinetests.com/',
-                    'https://ieltsliz.com/'
-                ]
-            }
-        }
-
-    return {
-        'current_score': current_score,
-        'target_score': target_score,
-        'test_type': test_type,
-        'duration': f"{num_weeks} weeks",
-        'hours_daily': hours_daily,
-        'intensity': intensity,
-        'weekly_plan': weekly_plan,
-        'generated_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def send_plan_pdf(plan_data):
+    """
+    Return plan_data as a PDF download response
+
+    Identical plan bodies are rendered once and then served from pdf_cache;
+    GET requests whose If-None-Match matches the content hash get a 304.
+    """
+    # reportlab is only imported once a worker actually renders a PDF
+    from pdf_export import render_plan_pdf
+
+    etag = pdf_cache_key(plan_data)
+    if request.method in ('GET', 'HEAD') and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    pdf_bytes = pdf_cache.get(etag)
+    if pdf_bytes is None:
+        pdf_bytes = render_plan_pdf(plan_data).getvalue()
+        pdf_cache.set(etag, pdf_bytes)
+
+    # Generate filename with timestamp
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+    filename = f"IELTS_StudyPlan_SparkSkyTech_{timestamp}.pdf"
+
+    response = send_file(
+        io.BytesIO(pdf_bytes),
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/pdf'
+    )
+    response.content_length = len(pdf_bytes)
+    response.set_etag(etag)
+    return response
+
+
+def job_status(job):
+    """JSON body describing a background PDF job"""
+    job_id = job['job_id']
+    status = {
+        'success': job['status'] != JOB_FAILED,
+        'job_id': job_id,
+        'status': job['status'],
+        'status_url': f'/jobs/{job_id}'
     }
+    if job['status'] == JOB_DONE:
+        status['result_url'] = f'/jobs/{job_id}/result'
+    if job['error']:
+        status['error'] = job['error']
+    return status
+
+
+def queue_plan_pdf(plan_data):
+    """
+    Queue a background PDF render and answer 202 with the job status
+
+    Answers 503 with Retry-After when this worker's queue is full.
+    """
+    try:
+        job = pdf_jobs.submit(plan_data)
+    except QueueFull as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+
+    response = jsonify(job_status(job))
+    response.status_code = 202
+    response.headers['Location'] = f"/jobs/{job['job_id']}"
+    return response
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask's JSON provider, encoding compact JSON with fast_json and
+    recording serialization time as a phase
+
+    Compact output is byte-for-byte what the default provider writes;
+    indented or spaced output (debug mode, dumps() without separators)
+    is left to the default provider.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.encoder = FastEncoder(default=self.default, fragments=fragments)
+
+    def _is_compact(self, kwargs):
+        return (self.ensure_ascii and self.sort_keys and kwargs.get('indent') is None
+                and kwargs.get('separators') == (',', ':')
+                and kwargs.keys() <= {'indent', 'separators'})
+
+    def dumps(self, obj, **kwargs):
+        with phase('json_serialize'):
+            if self._is_compact(kwargs):
+                return self.encoder.encode(obj).decode('ascii')
+            return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        with phase('json_serialize'):
+            body = self.encoder.encode(obj, b'\n')
+        return self._app.response_class(body, mimetype=self.mimetype)
+
 
 # Routes
-@app.route('/')
+bp = Blueprint('plans', __name__)
+
+@bp.before_app_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@bp.before_app_request
+def start_request_profile():
+    if request_profiler is not None and request_profiler.wants(request.headers):
+        g.profile = request_profiler.start()
+
+@bp.after_app_request
+def finish_request_profile(response):
+    """Write the request's profile; its file name is sent in X-Profile-Id"""
+    session = g.pop('profile', None)
+    if session is not None:
+        label = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        response.headers['X-Profile-Id'] = request_profiler.finish(session, label)
+    return response
+
+@bp.after_app_request
+def record_request_metrics(response):
+    """Count the request and its latency under its route pattern"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = {'route': route, 'method': request.method}
+        metrics.inc('ielts_http_requests_total', dict(labels, status=response.status_code))
+        metrics.observe('ielts_http_request_duration_seconds', labels,
+                        time.perf_counter() - started)
+    return response
+
+@bp.route('/')
 def index():
     """Serve the main HTML page"""
     return render_template('index.html')
 
-@app.route('/generate-plan', methods=['POST'])
+@bp.route('/generate-plan', methods=['POST'])
 def generate_plan():
     """Generate study plan from form data"""
     try:
-        # Get form data (support both slider and dropdown names)
-        current_score = request.form.get('current_score') or request.form.get('currentLevel')
-        target_score = request.form.get('target_score') or request.form.get('targetBand')
-        hours_daily = request.form.get('hours_daily') or request.form.get('hoursDaily')
-        test_type = request.form.get('test_type') or request.form.get('testType')
-        num_weeks_str = request.form.get('num_weeks') or request.form.get('prepDuration')
-
-        # Validate required fields
-        if not all([current_score, target_score, hours_daily, test_type, num_weeks_str]):
+        params = read_plan_params(request.form)
+        if params is None:
             return jsonify({'success': False, 'error': 'Missing required fields'}), 400
-
-        num_weeks = int(num_weeks_str)
+        current_score, target_score, hours_daily, test_type, num_weeks = params
+
+        # Lazy mode: only the first page of weeks is built now, the rest
+        # is served on demand from /plans/<plan_id>/weeks
+        if request.args.get('lazy') == '1':
+            lazy_plan = LazyPlan(current_score, target_score, hours_daily, test_type, num_weeks)
+            plan_id = plan_store.save(lazy_plan)
+            offset, limit = get_page_args()
+            page = lazy_plan.summary()
+            page['weekly_plan'] = lazy_plan.weeks(offset, limit)
+            return jsonify({
+                'success': True,
+                'plan_id': plan_id,
+                'plan': page,
+                'total_weeks': len(lazy_plan),
+                'next_offset': next_page_offset(offset, len(page['weekly_plan']), len(lazy_plan))
+            })
+
+        # Form inputs are served from the precomputed index; the plan is
+        # stored by its inputs and only rebuilt if it is exported
+        if plan_index is not None and not wants_compact_plan(request):
+            generated_date = current_timestamp()
+            plan_json = plan_index.render(normalize_plan_inputs(*params), generated_date)
+            if plan_json is not None:
+                plan_id = plan_store.save(LazyPlan(*params, generated_date=generated_date))
+                return send_indexed_plan(plan_json, plan_id)
 
         # Generate the plan
         study_plan = generate_study_plan(
             current_score, target_score, hours_daily, test_type, num_weeks
         )
 
-        return jsonify({'success': True, 'plan': study_plan})
+        plan_id = plan_store.save(study_plan)
+
+        # Opt-in compact payload (?format=compact or the compact Accept type)
+        if wants_compact_plan(request):
+            study_plan = compact_plan(study_plan)
+
+        return jsonify({'success': True, 'plan_id': plan_id, 'plan': study_plan})
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/export-text', methods=['POST'])
+@bp.route('/generate-plans', methods=['POST'])
+def generate_plans():
+    """
+    Generate study plans in bulk
+
+    Takes a JSON array or NDJSON of the /generate-plan fields and streams
+    back NDJSON, one {'index', 'success', 'plan_id', 'plan'} or
+    {'index', 'success', 'error'} line per item as it is generated.
+    """
+    try:
+        items = read_bulk_items()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    if len(items) > config.BULK_PLAN_MAX:
+        return jsonify({
+            'success': False,
+            'error': f"Batch too large: {len(items)} items (limit {config.BULK_PLAN_MAX})"
+        }), 413
+
+    return current_app.response_class(
+        iter_bulk_plans(items, current_app.json.dumps, compact=wants_compact_plan(request)),
+        mimetype='application/x-ndjson'
+    )
+
+@bp.route('/export-text', methods=['POST'])
 def export_text():
-    """Export study plan as plain text"""
+    """
+    Export study plan as plain text
+
+    Returns a JSON envelope by default; ?format=plain streams text/plain
+    and ?download=1 additionally marks it as a file download.
+    """
     try:
         plan_data = request.get_json()
         if not plan_data:
             return jsonify({'success': False, 'error': 'No data received'}), 400
+        plan_data = expand_plan(plan_data)
 
-        buffer = io.StringIO()
-
-        # Header
-        buffer.write("IELTS STUDY PLAN\n")
-        buffer.write("=" * 50 + "\n\n")
-
-        # Overview
-        buffer.write(f"Current Score: {plan_data['current_score']}\n")
-        buffer.write(f"Target Score: {plan_data['target_score']}\n")
-        buffer.write(f"Test Type: {plan_data['test_type'].title()}\n")
-        buffer.write(f"Duration: {plan_data['duration']}\n")
-        buffer.write(f"Daily Hours: {plan_data['hours_daily']} hours\n")
-        buffer.write(f"Generated: {plan_data['generated_date']}\n\n")
-
-        # Weekly plans
-        for week, details in plan_data['weekly_plan'].items():
-            buffer.write(f"{week.upper()}\n")
-            buffer.write(f"Focus: {details['focus']}\n\n")
-            for day, schedule in details['daily_schedule'].items():
-                buffer.write(f"  {day}:\n")
-                for activity in schedule:
-                    buffer.write(f"    • {activity['skill']}: {activity['duration']}\n")
-                    if 'activities' in activity:
-                        for task in activity['activities']:
-                            buffer.write(f"      - {task}\n")
-                buffer.write("\n")
-            buffer.write("-" * 30 + "\n\n")
-
-        content = buffer.getvalue()
-        buffer.close()
+        download = request.args.get('download') == '1'
+        if download or request.args.get('format') == 'plain':
+            return send_plan_text(plan_data, download=download)
+
+        content = render_plan_text(plan_data)
 
         return jsonify({'success': True, 'content': content})
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/export-pdf', methods=['POST'])
+@bp.route('/export-pdf', methods=['POST'])
 def export_pdf():
     """Export study plan as professional PDF with clickable footer and page numbers"""
     try:
         plan_data = request.get_json()
         if not plan_data:
             return jsonify({'error': 'No data provided'}), 400
+        plan_data = expand_plan(plan_data)
 
-        buffer = io.BytesIO()
-        
-        # Custom Canvas for headers/footers
-        class ProfessionalCanvas(canvas.Canvas):
-            def __init__(self, *args, **kwargs):
-                canvas.Canvas.__init__(self, *args, **kwargs)
-                self._saved_page_states = []
-                self.page_count = 0
-
-            def showPage(self):
-                self._saved_page_states.append(dict(self.__dict__))
-                self._startPage()
-
-            def save(self):
-                num_pages = len(self._saved_page_states)
-                for (page_num, page_state) in enumerate(self._saved_page_states):
-                    self.__dict__.update(page_state)
-                    self.draw_page_elements(page_num + 1, num_pages)
-                    canvas.Canvas.showPage(self)
-                canvas.Canvas.save(self)
-
-            def draw_page_elements(self, page_num, total_pages):
-                # Header
-                self.setFont("Helvetica-Bold", 16)
-                self.setFillColor(HexColor("#667eea"))
-                self.drawCentredText(letter[0]/2, letter[1] - 50, "IELTS Smart Study Plan")
-                
-                # Subheader
-                self.setFont("Helvetica", 12)
-                self.setFillColor(HexColor("#764ba2"))
-                self.drawCentredText(letter[0]/2, letter[1] - 70, "by SparkSkyTech")
-                
-                # Page number (top right)
-                self.setFont("Helvetica", 10)
-                self.setFillColor(colors.gray)
-                self.drawRightString(letter[0] - 50, letter[1] - 50, f"Page {page_num} of {total_pages}")
-                
-                # Footer with clickable links
-                footer_y = 50
-                
-                # Company name
-                self.setFont("Helvetica-Bold", 11)
-                self.setFillColor(HexColor("#667eea"))
-                self.drawString(50, footer_y + 20, "SparkSkyTech - IELTS Study Plan Generator")
-                
-                # Website link (clickable)
-                self.setFont("Helvetica", 10)
-                self.setFillColor(colors.blue)
-                website_text = "Visit: www.sparkskytech.com/ielts"
-                self.drawString(50, footer_y, website_text)
-                
-                # Make website clickable
-                self.linkURL("https://www.sparkskytech.com/ielts", 
-                           (50, footer_y - 5, 200, footer_y + 10))
-                
-                # Generation date (right side)
-                self.setFont("Helvetica", 9)
-                self.setFillColor(colors.gray)
-                gen_date = f"Generated: {plan_data['generated_date']}"
-                self.drawRightString(letter[0] - 50, footer_y, gen_date)
-                
-                # Separator line
-                self.setStrokeColor(HexColor("#e2e8f0"))
-                self.setLineWidth(0.5)
-                self.line(50, letter[1] - 90, letter[0] - 50, letter[1] - 90)  # Top line
-                self.line(50, footer_y + 35, letter[0] - 50, footer_y + 35)   # Bottom line
-
-        # Create document with custom canvas
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            topMargin=120,  # More space for header
-            bottomMargin=100,  # More space for footer
-            leftMargin=60,
-            rightMargin=60
-        )
+        # Background mode: render off the request, poll /jobs/<job_id>
+        if request.args.get('async') == '1':
+            return queue_plan_pdf(plan_data)
 
-        # Enhanced Styles
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=HexColor("#667eea"),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        section_style = ParagraphStyle(
-            'SectionHeader',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=HexColor("#764ba2"),
-            spaceAfter=15,
-            spaceBefore=20,
-            fontName='Helvetica-Bold',
-            borderWidth=1,
-            borderColor=HexColor("#e2e8f0"),
-            borderPadding=8,
-            backColor=HexColor("#f8fafc")
-        )
-        
-        week_style = ParagraphStyle(
-            'WeekHeader',
-            parent=styles['Heading3'],
-            fontSize=14,
-            textColor=HexColor("#667eea"),
-            spaceAfter=12,
-            spaceBefore=15,
-            fontName='Helvetica-Bold'
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            leading=16,
-            fontName='Helvetica'
-        )
-        
-        bullet_style = ParagraphStyle(
-            'BulletStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=4,
-            leading=14,
-            leftIndent=20,
-            fontName='Helvetica'
-        )
+        return send_plan_pdf(plan_data)
 
-        # Build content
-        content = []
-        
-        # Title Section
-        content.append(Paragraph("Your Personalized Study Plan", title_style))
-        content.append(Spacer(1, 20))
-
-        # Overview Table
-        overview_data = [
-            ['<b>Current Score:</b>', plan_data['current_score']],
-            ['<b>Target Score:</b>', plan_data['target_score']],
-            ['<b>Test Type:</b>', plan_data['test_type'].title()],
-            ['<b>Duration:</b>', plan_data['duration']],
-            ['<b>Daily Hours:</b>', f"{plan_data['hours_daily']} hours"],
-            ['<b>Intensity Level:</b>', plan_data['intensity']]
-        ]
-        
-        overview_table = Table(overview_data, colWidths=[2*inch, 3*inch])
-        overview_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), HexColor("#667eea")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('GRID', (0, 0), (-1, -1), 1, colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, HexColor("#f8fafc")])
-        ]))
-        
-        content.append(overview_table)
-        content.append(Spacer(1, 30))
-
-        # Weekly Plans
-        content.append(Paragraph("Weekly Study Schedule", section_style))
-        
-        for week_name, details in plan_data['weekly_plan'].items():
-            content.append(Paragraph(f"{week_name}", week_style))
-            content.append(Paragraph(f"<b>Focus:</b> {details['focus']}", normal_style))
-            content.append(Spacer(1, 10))
-            
-            # Daily schedule
-            for day, activities in details['daily_schedule'].items():
-                content.append(Paragraph(f"<b>{day}:</b>", normal_style))
-                
-                for activity in activities:
-                    activity_text = f"• <b>{activity['skill']}:</b> {activity['duration']}"
-                    content.append(Paragraph(activity_text, bullet_style))
-                    
-                    # Add specific activities if available
-                    if 'activities' in activity:
-                        for task in activity['activities'][:2]:  # Limit to 2 tasks for space
-                            task_text = f"  - {task}"
-                            content.append(Paragraph(task_text, bullet_style))
-                
-                content.append(Spacer(1, 8))
-            
-            # Weekly goals
-            if 'goals' in details and details['goals']:
-                content.append(Paragraph("<b>Weekly Goals:</b>", normal_style))
-                for goal in details['goals']:
-                    content.append(Paragraph(f"• {goal}", bullet_style))
-                
-            content.append(Spacer(1, 20))
-
-        # Resources Section
-        content.append(Paragraph("Recommended Resources", section_style))
-        
-        resources_text = f"""
-        <b>SparkSkyTech Resources:</b><br/>
-        • Comprehensive IELTS preparation materials<br/>
-        • Free practice tests and mock exams<br/>
-        • Expert strategies and tips<br/>
-        • Visit: <link href="https://www.sparkskytech.com/ielts">www.sparkskytech.com/ielts</link><br/><br/>
-        
-        <b>Official IELTS Resources:</b><br/>
-        • Official practice materials and sample tests<br/>
-        • Test format and scoring information<br/>
-        • Registration and test center details<br/><br/>
-        
-        <b>Additional Practice:</b><br/>
-        • British Council IELTS preparation courses<br/>
-        • Online mock tests and practice exercises<br/>
-        • Mobile apps for daily vocabulary building
-        """
-        
-        content.append(Paragraph(resources_text, normal_style))
-        
-        # Success tips
-        content.append(Spacer(1, 20))
-        content.append(Paragraph("Success Tips", week_style))
-        
-        tips_text = """
-        • <b>Consistency is key:</b> Study regularly even if for shorter periods<br/>
-        • <b>Track your progress:</b> Keep a study journal and note improvements<br/>
-        • <b>Practice under timed conditions:</b> Simulate real exam environment<br/>
-        • <b>Focus on weak areas:</b> Spend extra time on challenging skills<br/>
-        • <b>Use official materials:</b> Supplement with authentic IELTS content<br/>
-        • <b>Get feedback:</b> Have your writing and speaking assessed by experts
-        """
-        
-        content.append(Paragraph(tips_text, normal_style))
-
-        # Build PDF with custom canvas
-        doc.build(content, canvasmaker=ProfessionalCanvas)
-        buffer.seek(0)
-
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M')
-        filename = f"IELTS_StudyPlan_SparkSkyTech_{timestamp}.pdf"
+    except Exception as e:
+        print("PDF Export Error:", str(e))
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/export-pdfs', methods=['POST'])
+def export_pdfs():
+    """
+    Export many study plans as one ZIP of PDFs
+
+    Takes a JSON array whose items are plans (full or compact) or stored
+    plan IDs. Plans missing from pdf_cache are rendered in parallel on the
+    PDF process pool.
+    """
+    try:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Expected a JSON array of plans or plan IDs'}), 400
+        if len(items) > config.PDF_BATCH_MAX:
+            return jsonify({
+                'error': f"Batch too large: {len(items)} plans (limit {config.PDF_BATCH_MAX})"
+            }), 413
+
+        plans = []
+        for item in items:
+            if isinstance(item, str):
+                plan_data = load_plan(item)
+                if plan_data is None:
+                    return jsonify({'error': f"Plan not found: {item}"}), 404
+            elif isinstance(item, dict):
+                plan_data = expand_plan(item)
+            else:
+                return jsonify({'error': 'Each item must be a plan or a plan ID'}), 400
+            plans.append(plan_data)
+
+        # Render each distinct, uncached plan body once
+        keys = [pdf_cache_key(plan_data) for plan_data in plans]
+        documents = {}
+        for key in keys:
+            if key not in documents:
+                documents[key] = pdf_cache.get(key)
+        pending = {key: plans[index] for index, key in enumerate(keys) if documents[key] is None}
+        for key, (pdf_bytes, error) in zip(pending, render_plan_pdfs(pending.values())):
+            if error is not None:
+                raise RuntimeError(error)
+            pdf_cache.set(key, pdf_bytes)
+            documents[key] = pdf_bytes
+
+        archive = tempfile.SpooledTemporaryFile(max_size=config.PDF_SPOOL_MAX_BYTES)
+        write_pdf_zip(((plan_pdf_name(index), documents[key]) for index, key in enumerate(keys)),
+                      archive)
+        size = archive.seek(0, io.SEEK_END)
+        archive.seek(0)
 
-        return send_file(
-            buffer,
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+        response = send_file(
+            archive,
             as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+            download_name=f"IELTS_StudyPlans_SparkSkyTech_{timestamp}.zip",
+            mimetype='application/zip'
         )
+        response.content_length = size
+        return response
+
+    except Exception as e:
+        print("PDF Export Error:", str(e))
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/plans/<plan_id>')
+def get_plan(plan_id):
+    """Return a stored study plan"""
+    plan_data = load_plan(plan_id)
+    if plan_data is None:
+        return jsonify({'success': False, 'error': 'Plan not found'}), 404
+    if wants_compact_plan(request):
+        plan_data = compact_plan(plan_data)
+    return jsonify({'success': True, 'plan_id': plan_id, 'plan': plan_data})
+
+@bp.route('/plans/<plan_id>/weeks')
+def get_plan_weeks(plan_id):
+    """Return one page of weeks from a stored plan (?offset=&limit=)"""
+    plan = plan_store.get(plan_id)
+    if plan is None:
+        return jsonify({'success': False, 'error': 'Plan not found'}), 404
+
+    offset, limit = get_page_args()
+    if isinstance(plan, LazyPlan):
+        total = len(plan)
+        weeks = plan.weeks(offset, limit)
+    else:
+        total = len(plan['weekly_plan'])
+        weeks = dict(list(plan['weekly_plan'].items())[offset:offset + limit])
+
+    return jsonify({
+        'success': True,
+        'plan_id': plan_id,
+        'offset': offset,
+        'limit': limit,
+        'total_weeks': total,
+        'next_offset': next_page_offset(offset, len(weeks), total),
+        'weeks': weeks
+    })
+
+@bp.route('/plans/<plan_id>/regenerate', methods=['POST'])
+def regenerate_stored_plan(plan_id):
+    """
+    Regenerate a stored plan with changed inputs and return a JSON Patch
+
+    Takes the /generate-plan fields (form or JSON); only those given are
+    changed. The new plan is stored under a new plan_id and the response
+    carries the RFC 6902 patch from the old plan to it.
+    """
+    try:
+        plan_data = load_plan(plan_id)
+        if plan_data is None:
+            return jsonify({'success': False, 'error': 'Plan not found'}), 404
+
+        changes = read_plan_fields(request.get_json(silent=True) or request.form)
+        if 'num_weeks' in changes:
+            changes['num_weeks'] = int(changes['num_weeks'])
+
+        new_plan, patch = regenerate_plan(plan_data, changes)
+        new_plan_id = plan_store.save(new_plan) if patch else plan_id
+
+        return jsonify({
+            'success': True,
+            'base_plan_id': plan_id,
+            'plan_id': new_plan_id,
+            'patch': patch
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/plans/<plan_id>.txt')
+def export_stored_text(plan_id):
+    """Download a stored study plan as plain text"""
+    try:
+        plan_data = load_plan(plan_id)
+        if plan_data is None:
+            return jsonify({'success': False, 'error': 'Plan not found'}), 404
+
+        return send_plan_text(plan_data, download=True)
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/plans/<plan_id>.pdf')
+def export_stored_pdf(plan_id):
+    """Download a stored study plan as PDF"""
+    try:
+        plan_data = load_plan(plan_id)
+        if plan_data is None:
+            return jsonify({'error': 'Plan not found'}), 404
+
+        return send_plan_pdf(plan_data)
 
     except Exception as e:
         print("PDF Export Error:", str(e))
         return jsonify({'error': str(e)}), 500
 
-@app.route('/health')
+@bp.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Return the status of a background PDF export"""
+    job = pdf_jobs.store.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify(job_status(job))
+
+@bp.route('/jobs/<job_id>/result')
+def get_job_result(job_id):
+    """Download the PDF of a finished background export"""
+    job = pdf_jobs.store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != JOB_DONE:
+        return jsonify(job_status(job)), 409
+
+    pdf_bytes = pdf_jobs.store.get_result(job_id)
+    if pdf_bytes is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+    response = send_file(
+        io.BytesIO(pdf_bytes),
+        as_attachment=True,
+        download_name=f"IELTS_StudyPlan_SparkSkyTech_{timestamp}.pdf",
+        mimetype='application/pdf'
+    )
+    response.content_length = len(pdf_bytes)
+    response.set_etag(job['etag'])
+    return response
+
+@bp.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'plan_cache': plan_cache.stats(),
+        'pdf_cache': pdf_cache.stats(),
+        'pdf_jobs': pdf_jobs.stats(),
+        'plan_index': plan_index.stats() if plan_index is not None else None,
+        'json_fragments': fragments.stats()
+    })
+
+@bp.route('/metrics')
+def get_metrics():
+    """Prometheus metrics, summed over all workers with a shared METRICS_STORE"""
+    return current_app.response_class(
+        metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+def require_profile_admin():
+    """404 unless profiling is on and the request carries the admin token"""
+    if request_profiler is None or not request_profiler.is_admin(request.headers):
+        abort(404)
+
+@bp.route('/admin/profiles')
+def list_profiles():
+    """List the stored request profiles, newest first"""
+    require_profile_admin()
+    return jsonify({'success': True, 'mode': request_profiler.mode,
+                    'profiles': request_profiler.list_profiles()})
+
+@bp.route('/admin/profiles/<name>')
+def download_profile(name):
+    """Download one stored request profile"""
+    require_profile_admin()
+    path = request_profiler.profile_path(name)
+    if path is None:
+        return jsonify({'success': False, 'error': 'Profile not found'}), 404
+    return send_file(path, as_attachment=True, download_name=name,
+                     mimetype='application/octet-stream')
+
+def warm_up():
+    """
+    Build the shared, read-only catalogs before the first request
+
+    Covers the day template of every form choice, the PDF theme and
+    reportlab's own lazily loaded state (by rendering a one-week plan).
+    Under gunicorn --preload this runs once in the master (see
+    gunicorn.conf.py), so forked workers share it copy-on-write.
+    """
+    for hours in range(1, 9):
+        for test_type in ('academic', 'general'):
+            build_day_template(str(hours), test_type)
+
+    from pdf_export import get_pdf_theme, render_plan_pdf
+    render_plan_pdf(generate_study_plan('5.5', '7.0', '1', 'academic', 1), get_pdf_theme())
+
+
+def create_app():
+    """
+    Create the Flask application
+
+    The plan store, caches and job queue above are per process and shared
+    by every app built here.
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    # Ensure upload folder exists (next to the app, whatever the cwd)
+    os.makedirs(os.path.join(app.static_folder, 'uploads'), exist_ok=True)
+
+    app.register_blueprint(bp)
+    return app
+
+
+app = create_app()
 
 # Run App
 if __name__ == '__main__':
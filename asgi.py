@@ -0,0 +1,204 @@
+"""
+ASGI entry point
+
+Serves the Flask app from an asyncio event loop, so one worker process
+takes many connections at once instead of one per sync worker. Cheap
+requests (plan generation, stored plans, job polling) run inline on the
+loop; exports and bulk generation, which hold the CPU for much longer, run
+on a bounded thread pool so a slow render does not stall the plan requests
+queued behind it. When ASGI_EXPORT_MAX_PENDING offloaded requests are
+already running or waiting, further ones are answered 503 with Retry-After.
+
+Usage:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT --workers $WEB_CONCURRENCY
+"""
+import asyncio
+import io
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import config
+from app import app as flask_app, warm_up
+
+# Requests for these paths run on the export pool; all others run inline
+OFFLOADED_PATHS = re.compile(r'^/(export-[^/]+|generate-plans|plans/[^/]+\.(pdf|txt))$')
+
+
+async def read_body(receive):
+    """Read the whole request body from ASGI http.request messages"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+
+def wsgi_environ(scope, body):
+    """Build the WSGI environ for an ASGI http scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        # WSGI carries paths as latin-1 decoded bytes
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0] or 'localhost',
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        # The body is read whole before the request runs, so it can be
+        # read to its end even without a Content-Length (chunked uploads)
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else 'HTTP_' + name
+        value = value.decode('latin-1')
+        if key in environ:
+            separator = '; ' if key == 'HTTP_COOKIE' else ','
+            value = environ[key] + separator + value
+        environ[key] = value
+    environ.setdefault('CONTENT_LENGTH', str(len(body)))
+    return environ
+
+
+def run_wsgi(wsgi_app, environ, emit):
+    """
+    Run one WSGI request, passing the ASGI response messages to emit()
+
+    Body chunks are emitted as the app yields them, so streamed responses
+    (NDJSON, spooled PDFs) stay streamed.
+    """
+    response = []
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and sent:
+            raise exc_info[1].with_traceback(exc_info[2])
+        response[:] = [status, headers]
+
+    def start():
+        status, headers = response
+        emit({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in headers]
+        })
+
+    sent = False
+    iterable = wsgi_app(environ, start_response)
+    try:
+        for chunk in iterable:
+            if not chunk:
+                continue
+            if not sent:
+                start()
+                sent = True
+            emit({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    if not sent:
+        start()
+    emit({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+class AsgiApp:
+    """
+    ASGI front for a WSGI app with a bounded pool for slow requests
+
+    pending and rejected are only touched on the event loop thread, so
+    they need no lock.
+    """
+
+    def __init__(self, wsgi_app, workers=2, max_pending=32):
+        self.wsgi_app = wsgi_app
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        self.pending = 0
+        self.rejected = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        environ = wsgi_environ(scope, await read_body(receive))
+        if not OFFLOADED_PATHS.match(scope['path']):
+            messages = []
+            run_wsgi(self.wsgi_app, environ, messages.append)
+            for message in messages:
+                await send(message)
+            return
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            await self.send_busy(send)
+            return
+        self.pending += 1
+        try:
+            await self.offload(environ, send)
+        finally:
+            self.pending -= 1
+
+    async def offload(self, environ, send):
+        """Run a request on the export pool, relaying its messages"""
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue()
+        emit = partial(loop.call_soon_threadsafe, messages.put_nowait)
+        future = loop.run_in_executor(self.executor, run_wsgi, self.wsgi_app, environ, emit)
+        # Queued after every message the request emitted, including on errors
+        future.add_done_callback(lambda _: messages.put_nowait(None))
+        while True:
+            message = await messages.get()
+            if message is None:
+                break
+            await send(message)
+        await future
+
+    async def send_busy(self, send):
+        body = json.dumps({
+            'success': False,
+            'error': f"Too many exports in progress (limit {self.max_pending})"
+        }, separators=(',', ':'), sort_keys=True).encode() + b'\n'
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode()),
+                        (b'retry-after', b'5')]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                warm_up()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = AsgiApp(flask_app, config.ASGI_EXPORT_WORKERS, config.ASGI_EXPORT_MAX_PENDING)
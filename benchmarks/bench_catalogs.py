@@ -0,0 +1,73 @@
+"""
+Allocation check: shared study_plan_logic catalogs
+
+study_plan_logic used to rebuild its six task pools, the resources mapping
+and the day names on every call. This script measures, with tracemalloc,
+the peak memory of rebuilding those catalogs (the old per-call overhead)
+and of a whole generate_study_plan call now, and verifies that hourly
+slots reference the shared RESOURCES entries.
+
+Exits non-zero if a small plan now allocates as much as the old catalog
+rebuild alone, or if slots stop sharing resource entries.
+
+Usage:
+    python -m benchmarks.bench_catalogs
+"""
+import sys
+import tracemalloc
+
+import study_plan_logic
+from study_plan_logic import generate_study_plan
+
+
+def rebuild_catalogs():
+    """Allocate the per-call catalogs the previous implementation built"""
+    pools = [list(pool) for pool in (
+        study_plan_logic.READING_TASKS, study_plan_logic.LISTENING_TASKS,
+        study_plan_logic.WRITING_TASKS_ACADEMIC, study_plan_logic.WRITING_TASKS_GENERAL,
+        study_plan_logic.SPEAKING_TASKS, study_plan_logic.GENERAL_TASKS,
+    )]
+    tasks = pools[0][:3] + pools[1][:3] + pools[2][:3] + pools[4] + pools[5]
+    resources = {task: list(entries) for task, entries in study_plan_logic.RESOURCES.items()}
+    days_of_week = list(study_plan_logic.DAYS_OF_WEEK)
+    return tasks, resources, days_of_week
+
+
+def traced_peak(func):
+    func()  # warm up
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    rebuild = traced_peak(rebuild_catalogs)
+    print(f"{'old per-call catalog rebuild':<34} {rebuild:>9} B")
+    for hours, weeks in ((1, 1), (2, 4), (8, 12)):
+        peak = traced_peak(lambda: generate_study_plan("Academic", 5.5, 7.0, hours, weeks))
+        print(f"{f'plan {hours}h x {weeks}w (whole call)':<34} {peak:>9} B")
+
+    ok = True
+    small = traced_peak(lambda: generate_study_plan("Academic", 5.5, 7.0, 1, 1))
+    if small >= rebuild:
+        print("FAIL: a 1-hour, 1-week plan allocates as much as the old catalog rebuild")
+        ok = False
+
+    first = generate_study_plan("General Training", 5.5, 7.0, 3, 2)
+    second = generate_study_plan("General Training", 6.0, 8.0, 3, 2)
+    for plan in (first, second):
+        for day in plan["Week 1"].values():
+            for slot in day:
+                shared = study_plan_logic.RESOURCES.get(slot["Task"], study_plan_logic.NO_SPECIFIC_RESOURCES)
+                if slot["Resources"] is not shared:
+                    print(f"FAIL: slot for {slot['Task']!r} does not reference the shared entry")
+                    ok = False
+
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
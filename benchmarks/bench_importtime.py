@@ -0,0 +1,85 @@
+"""
+Import-time check: cost of importing the web app
+
+Runs `python -X importtime -c "import app"` in fresh interpreters, reports
+the best cumulative import time of app and its slowest direct imports, and
+checks that modules which must load lazily (the reportlab PDF stack) are
+not imported with the app.
+
+Exits non-zero if a lazily loaded module was imported, or if the import
+took longer than --max-ms.
+
+Usage:
+    python -m benchmarks.bench_importtime [--runs N] [--max-ms MS]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that must only load on first use
+LAZY_MODULES = ('reportlab', 'pdf_export')
+
+
+def import_times(module):
+    """
+    Return ({module name: cumulative µs}, [(cumulative µs, name) of the
+    modules imported directly by module]) for one cold import
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative)))
+
+    # A module is reported after everything it imported, with less indent
+    position = max(i for i, entry in enumerate(entries) if entry[1] == module)
+    indent = entries[position][0]
+    children = []
+    for child_indent, name, cumulative in reversed(entries[:position]):
+        if child_indent <= indent:
+            break
+        if child_indent == indent + 2:
+            children.append((cumulative, name))
+
+    return {name: cumulative for _, name, cumulative in entries}, sorted(children, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='fail if importing app takes longer than this')
+    args = parser.parse_args()
+
+    runs = [import_times('app') for _ in range(args.runs)]
+    times, direct = min(runs, key=lambda run: run[0]['app'])
+    total_ms = times['app'] / 1000
+
+    print(f"{'import app (best of ' + str(args.runs) + ')':<32} {total_ms:>9.1f} ms")
+    for us, name in direct[:8]:
+        print(f"  {name:<30} {us / 1000:>9.1f} ms")
+
+    ok = True
+    loaded = sorted(name for name in times if name.split('.')[0] in LAZY_MODULES)
+    if loaded:
+        print(f"FAIL: imported with app but should load lazily: {', '.join(loaded[:5])}")
+        ok = False
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"FAIL: import app took {total_ms:.1f} ms (limit {args.max_ms:.1f} ms)")
+        ok = False
+
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
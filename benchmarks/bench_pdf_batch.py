@@ -0,0 +1,79 @@
+"""
+Benchmark: batch PDF export throughput by worker count
+
+Renders N distinct plans (so no cache hits) serially in this process and
+then on warmed process pools of increasing size, and reports plans per
+second and the speed-up over the serial render. Pools are warmed before
+timing, as the shared pool is in a long-running server.
+
+Usage:
+    python -m benchmarks.bench_pdf_batch [--plans N] [--workers 1,2,4]
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import config
+from pdf_batch import _warm_worker, render_plan_pdfs
+from pdf_export import render_plan_pdf
+from planner import generate_study_plan
+
+SCORES = ['4.0', '4.5', '5.0', '5.5', '6.0', '6.5']
+
+
+def distinct_plans(count):
+    plans = []
+    for index in range(count):
+        plans.append(generate_study_plan(
+            SCORES[index % len(SCORES)], '7.5', str(1 + index % 8),
+            'academic' if index % 2 else 'general', 4 + index % 9
+        ))
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--plans', type=int, default=24)
+    parser.add_argument('--workers', default=None,
+                        help='comma-separated pool sizes (default: 1, 2, 4, ... up to the CPU count)')
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        sizes = [int(size) for size in args.workers.split(',')]
+    else:
+        sizes = [1]
+        while sizes[-1] * 2 <= cpus:
+            sizes.append(sizes[-1] * 2)
+        if sizes[-1] != cpus:
+            sizes.append(cpus)
+
+    plans = distinct_plans(args.plans)
+    render_plan_pdf(plans[0])  # warm up this process
+
+    start = time.perf_counter()
+    for plan_data in plans:
+        render_plan_pdf(plan_data)
+    serial = time.perf_counter() - start
+
+    print(f"plans: {args.plans}  CPUs: {cpus}")
+    print(f"{'mode':<12} {'seconds':>8} {'plans/s':>8} {'speed-up':>9}")
+    print(f"{'serial':<12} {serial:>8.2f} {args.plans / serial:>8.1f} {1.0:>9.2f}")
+
+    context = multiprocessing.get_context(config.PDF_POOL_START_METHOD)
+    for size in sizes:
+        with ProcessPoolExecutor(size, mp_context=context, initializer=_warm_worker) as pool:
+            # Start every worker before timing
+            wait([pool.submit(os.getpid) for _ in range(size * 4)])
+            start = time.perf_counter()
+            results = list(render_plan_pdfs(plans, pool))
+            elapsed = time.perf_counter() - start
+        assert all(error is None for _, error in results)
+        print(f"{f'{size} workers':<12} {elapsed:>8.2f} {args.plans / elapsed:>8.1f} "
+              f"{serial / elapsed:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
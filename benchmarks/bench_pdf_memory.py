@@ -0,0 +1,81 @@
+"""
+Memory benchmark: PDF page numbering strategies
+
+Renders the largest plan the UI allows (12 weeks, 8 hours a day) with the
+current deferred page-label canvas and with the previous canvas that kept a
+copy of its state for every page, and reports tracemalloc peak memory and
+wall time for each.
+
+Usage:
+    python -m benchmarks.bench_pdf_memory [--weeks N] [--hours N]
+"""
+import argparse
+import time
+import tracemalloc
+
+from reportlab.pdfgen import canvas
+
+from app import generate_study_plan
+from pdf_export import ProfessionalCanvas, PdfTheme, get_pdf_theme, render_plan_pdf
+
+
+class SnapshotCanvas(ProfessionalCanvas):
+    """Previous strategy: snapshot every page, decorate all pages in save()"""
+
+    def __init__(self, *args, **kwargs):
+        ProfessionalCanvas.__init__(self, *args, **kwargs)
+        self._saved_page_states = []
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        num_pages = len(self._saved_page_states)
+        for (page_num, page_state) in enumerate(self._saved_page_states):
+            annotation_count = self._annotationCount
+            self.__dict__.update(page_state)
+            self._annotationCount = annotation_count
+            self.pdf_theme.draw_page_elements(self, page_num + 1, self.generated_date)
+            canvas.Canvas.showPage(self)
+        for page_num in range(1, num_pages + 1):
+            self.beginForm(f"PageLabel{page_num}")
+            self.pdf_theme.draw_page_label(self, page_num, num_pages)
+            self.endForm()
+        canvas.Canvas.save(self)
+
+
+class SnapshotTheme(PdfTheme):
+    canvas_class = SnapshotCanvas
+
+
+def measure(plan, theme):
+    render_plan_pdf(plan, theme)  # warm up fonts and caches
+    start = time.perf_counter()
+    size = len(render_plan_pdf(plan, theme).getvalue())
+    elapsed = time.perf_counter() - start
+
+    # Measured in a separate run: tracemalloc slows allocation-heavy code a lot
+    tracemalloc.start()
+    render_plan_pdf(plan, theme)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--weeks', type=int, default=12)
+    parser.add_argument('--hours', type=int, default=8)
+    args = parser.parse_args()
+
+    plan = generate_study_plan('3.0', '9.0', str(args.hours), 'academic', args.weeks)
+    for label, theme in (('page snapshots', SnapshotTheme()),
+                         ('deferred page labels', get_pdf_theme())):
+        size, elapsed, peak = measure(plan, theme)
+        print(f"{label:<22} {size / 1024:8.1f} KiB pdf  {elapsed * 1000:8.1f} ms  "
+              f"{peak / 1024 / 1024:8.2f} MiB peak")
+
+
+if __name__ == '__main__':
+    main()
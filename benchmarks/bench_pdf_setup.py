@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: per-request PDF setup cost
+
+Compares the setup export_pdf used to repeat on every request (sample
+stylesheet, five ParagraphStyles, the overview TableStyle and a fresh canvas
+class) with fetching the shared PdfTheme.
+
+Usage:
+    python -m benchmarks.bench_pdf_setup [--number N]
+"""
+import argparse
+import timeit
+
+from reportlab.lib import colors
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfgen import canvas
+from reportlab.platypus import TableStyle
+
+from pdf_export import get_pdf_theme
+
+
+def per_request_setup():
+    """Setup work previously done inside every export_pdf call"""
+    class ProfessionalCanvas(canvas.Canvas):
+        pass
+
+    styles = getSampleStyleSheet()
+    ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24,
+                   textColor=HexColor("#667eea"), spaceAfter=30,
+                   alignment=TA_CENTER, fontName='Helvetica-Bold')
+    ParagraphStyle('SectionHeader', parent=styles['Heading2'], fontSize=16,
+                   textColor=HexColor("#764ba2"), spaceAfter=15, spaceBefore=20,
+                   fontName='Helvetica-Bold', borderWidth=1,
+                   borderColor=HexColor("#e2e8f0"), borderPadding=8,
+                   backColor=HexColor("#f8fafc"))
+    ParagraphStyle('WeekHeader', parent=styles['Heading3'], fontSize=14,
+                   textColor=HexColor("#667eea"), spaceAfter=12, spaceBefore=15,
+                   fontName='Helvetica-Bold')
+    ParagraphStyle('CustomNormal', parent=styles['Normal'], fontSize=11,
+                   spaceAfter=6, leading=16, fontName='Helvetica')
+    ParagraphStyle('BulletStyle', parent=styles['Normal'], fontSize=10,
+                   spaceAfter=4, leading=14, leftIndent=20, fontName='Helvetica')
+    TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor("#667eea")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('GRID', (0, 0), (-1, -1), 1, colors.lightgrey),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, HexColor("#f8fafc")])
+    ])
+    return ProfessionalCanvas
+
+
+def shared_theme_setup():
+    """Setup work done per request with the shared theme"""
+    theme = get_pdf_theme()
+    return theme.canvasmaker('2024-01-01 00:00:00')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    get_pdf_theme()  # first use builds the theme; not part of per-request cost
+    for label, func in (('per-request setup', per_request_setup),
+                        ('shared theme', shared_theme_setup)):
+        seconds = min(timeit.repeat(func, number=args.number, repeat=5))
+        print(f"{label:<20} {seconds / args.number * 1e6:10.2f} us/request")
+
+
+if __name__ == '__main__':
+    main()
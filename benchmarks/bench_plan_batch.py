@@ -0,0 +1,72 @@
+"""
+Benchmark: batch plan generation for a cohort
+
+Generates plans for N students (10,000 by default) with random inputs,
+comparing a loop over planner.generate_study_plan (plan cache cleared
+first) with plan_batch.generate_plan_batch: computing the columns, and
+computing them plus expanding every student's plan. Every expanded plan
+is checked against generate_study_plan, and with numpy the whole batch is
+also checked against one built from list columns.
+
+Usage:
+    python -m benchmarks.bench_plan_batch [--students N] [--no-numpy]
+"""
+import argparse
+import random
+import time
+
+import plan_batch
+from plan_batch import generate_plan_batch
+from planner import generate_study_plan, plan_cache
+
+SCORES = ['3.0', '4.0', '4.5', '5.0', '5.5', '6.0', '6.5', '7.0', '7.5', '8.0', '8.5', '9.0']
+
+
+def random_cohort(size, seed=0):
+    rng = random.Random(seed)
+    current = [rng.choice(SCORES[:8]) for _ in range(size)]
+    target = [rng.choice(SCORES[4:]) for _ in range(size)]
+    hours = [str(rng.randint(1, 8)) for _ in range(size)]
+    test_types = [rng.choice(('academic', 'general')) for _ in range(size)]
+    weeks = [rng.randint(1, 24) for _ in range(size)]
+    return current, target, hours, test_types, weeks
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--no-numpy', action='store_true')
+    args = parser.parse_args()
+
+    cohort = random_cohort(args.students)
+    use_numpy = plan_batch.np is not None and not args.no_numpy
+
+    plan_cache.clear()
+    loop_plans, loop_time = timed(lambda: [generate_study_plan(*row) for row in zip(*cohort)])
+    batch, columns_time = timed(lambda: generate_plan_batch(*cohort, use_numpy=use_numpy))
+    _, expand_time = timed(lambda: [batch.plan_model(i) for i in range(len(batch))])
+
+    for index in range(args.students):
+        expected = dict(loop_plans[index], generated_date=batch.generated_date)
+        assert batch.plan(index) == expected, index
+    if use_numpy:
+        lists = generate_plan_batch(*cohort, generated_date=batch.generated_date, use_numpy=False)
+        for name in ('score_gap', 'intensity', 'foundation_end', 'development_end'):
+            assert list(batch.columns[name]) == list(lists.columns[name]), name
+        for skill, minutes in batch.columns['minutes'].items():
+            assert list(minutes) == lists.columns['minutes'][skill], skill
+
+    print(f"students: {args.students}  columns: {'numpy' if use_numpy else 'lists'}")
+    print(f"{'generate_study_plan loop':<32} {loop_time * 1000:>9.1f} ms")
+    print(f"{'batch columns':<32} {columns_time * 1000:>9.1f} ms")
+    print(f"{'batch columns + expand models':<32} {(columns_time + expand_time) * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
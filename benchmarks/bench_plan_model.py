@@ -0,0 +1,121 @@
+"""
+Benchmark: plan model vs nested dicts
+
+Compares the tracemalloc size of study_plan_logic plans held as the
+plan_model classes and as the serialized nested dicts, and times the text
+exporter over a fresh (unshared) JSON plan against the previous dict walk.
+
+Whole calls of both planners, which return dicts, are timed (with their
+tracemalloc peak) against building the model and serializing it.
+
+Usage:
+    python -m benchmarks.bench_plan_model [--repeat N]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from app import iter_plan_text
+from plan_model import Plan
+from planner import (
+    build_day_template, build_plan_body, build_week, get_intensity, get_score_gap,
+    generate_study_plan as generate_app_plan
+)
+from study_plan_logic import build_study_plan, generate_study_plan
+
+
+def legacy_plan_text(plan_data):
+    """Text export as previously implemented (weeks only)"""
+    for week, details in plan_data['weekly_plan'].items():
+        lines = [f"{week.upper()}\n", f"Focus: {details['focus']}\n\n"]
+        for day, schedule in details['daily_schedule'].items():
+            lines.append(f"  {day}:\n")
+            for activity in schedule:
+                lines.append(f"    • {activity['skill']}: {activity['duration']}\n")
+                if 'activities' in activity:
+                    for task in activity['activities']:
+                        lines.append(f"      - {task}\n")
+            lines.append("\n")
+        lines.append("-" * 30 + "\n\n")
+        yield ''.join(lines)
+
+
+def model_plan_body(current_score, target_score, hours_daily, test_type, num_weeks):
+    """Plan body built as the model and serialized, as previously implemented"""
+    score_gap = get_score_gap(current_score, target_score)
+    days = build_day_template(hours_daily, test_type)
+    weeks = [build_week(week, num_weeks, score_gap, target_score, days)
+             for week in range(1, num_weeks + 1)]
+    return Plan(weeks, current_score=current_score, target_score=target_score,
+                test_type=test_type, duration=f"{num_weeks} weeks", hours_daily=hours_daily,
+                intensity=get_intensity(score_gap)).to_dict()
+
+
+def retained(func):
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def peak(func):
+    tracemalloc.start()
+    func()
+    _, size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'study_plan_logic plan':<26} {'model KiB':>10} {'dicts KiB':>10}")
+    for hours, weeks in ((2, 4), (8, 12), (8, 52)):
+        model, model_size = retained(lambda: build_study_plan("Academic", 5.5, 7.0, hours, weeks))
+        _, dict_size = retained(model.to_schedule_dict)
+        print(f"{f'{hours}h x {weeks}w':<26} {model_size / 1024:>10.1f} {dict_size / 1024:>10.1f}")
+
+    print()
+    print(f"{'text export (JSON plan)':<26} {'model ms':>10} {'dicts ms':>10}")
+    for hours, weeks in (('3', 4), ('8', 12), ('8', 52)):
+        # Round-trip through JSON so nothing is shared, as for a POSTed plan
+        plan = json.loads(json.dumps(generate_app_plan('5.5', '7.0', hours, 'academic', weeks)))
+        model_time = best_of(lambda: ''.join(iter_plan_text(plan)), args.repeat)
+        dict_time = best_of(lambda: ''.join(legacy_plan_text(plan)), args.repeat)
+        print(f"{f'{hours}h x {weeks}w':<26} {model_time * 1000:>10.3f} {dict_time * 1000:>10.3f}")
+
+    print()
+    print(f"{'whole call':<26} {'dicts ms':>10} {'model ms':>10} {'dicts KiB':>10} {'model KiB':>10}")
+    calls = [
+        (f'study_plan_logic {hours}h x {weeks}w',
+         lambda hours=hours, weeks=weeks: generate_study_plan("Academic", 5.5, 7.0, hours, weeks),
+         lambda hours=hours, weeks=weeks: build_study_plan(
+             "Academic", 5.5, 7.0, hours, weeks).to_schedule_dict())
+        for hours, weeks in ((2, 4), (8, 12), (8, 52))
+    ] + [
+        (f'build_plan_body {hours}h x {weeks}w',
+         lambda hours=hours, weeks=weeks: build_plan_body('5.5', '7.0', hours, 'academic', weeks),
+         lambda hours=hours, weeks=weeks: model_plan_body('5.5', '7.0', hours, 'academic', weeks))
+        for hours, weeks in (('3', 4), ('8', 12), ('8', 52))
+    ]
+    for label, dicts, model in calls:
+        print(f"{label:<26} {best_of(dicts, args.repeat) * 1000:>10.3f} "
+              f"{best_of(model, args.repeat) * 1000:>10.3f} "
+              f"{peak(dicts) / 1024:>10.1f} {peak(model) / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: per-worker memory with and without the preloaded, frozen app
+
+Starts gunicorn twice with the same number of workers, once with default
+settings (every worker imports the app itself) and once with
+gunicorn.conf.py (preload, warm_up() and gc.freeze() in the master),
+sends the same mix of plan and PDF requests to each, and reports the
+average RSS, PSS and USS (private) memory per worker from
+/proc/<pid>/smaps_rollup. PSS and USS show what sharing saves; RSS counts
+shared pages in full for every worker. Linux only.
+
+Usage:
+    python -m benchmarks.bench_preload_rss [--workers 8] [--requests 200]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORM = {'current_score': '5.5', 'target_score': '7.0', 'test_type': 'academic', 'num_weeks': '8'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_kib(pid):
+    """Return (rss, pss, uss) in KiB for a process"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    uss = fields['Private_Clean'] + fields['Private_Dirty']
+    return fields['Rss'], fields['Pss'], uss
+
+
+def wait_until_up(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/health', timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def drive(base_url, requests):
+    """Mixed load: plan generation for every hours value, some PDF exports"""
+    for index in range(requests):
+        form = dict(FORM, hours_daily=str(1 + index % 8))
+        body = urllib.parse.urlencode(form).encode()
+        with urllib.request.urlopen(base_url + '/generate-plan', body) as response:
+            plan = json.load(response)['plan']
+        if index % 10 == 0:
+            request = urllib.request.Request(
+                base_url + '/export-pdf', json.dumps(plan).encode(),
+                {'Content-Type': 'application/json'}
+            )
+            urllib.request.urlopen(request).read()
+
+
+def measure(config_args, workers, requests):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT, WEB_CONCURRENCY=str(workers))
+    command = [sys.executable, '-m', 'gunicorn', *config_args,
+               '-w', str(workers), '-b', f'127.0.0.1:{port}', 'app:app']
+    master = subprocess.Popen(command, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base_url = f'http://127.0.0.1:{port}'
+        wait_until_up(base_url)
+        drive(base_url, requests)
+        time.sleep(1)
+        pids = worker_pids(master.pid)
+        samples = [memory_kib(pid) for pid in pids]
+    finally:
+        master.terminate()
+        master.wait(timeout=30)
+    count = len(samples)
+    return [sum(sample[i] for sample in samples) / count for i in range(3)], count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    modes = (
+        ('default', ['-c', '/dev/null']),
+        ('preload + freeze', ['-c', os.path.join(ROOT, 'gunicorn.conf.py')]),
+    )
+    print(f"{'mode':<18} {'workers':>7} {'RSS MiB':>8} {'PSS MiB':>8} {'USS MiB':>8}  (per worker)")
+    for name, config_args in modes:
+        (rss, pss, uss), count = measure(config_args, args.workers, args.requests)
+        print(f"{name:<18} {count:>7} {rss / 1024:>8.1f} {pss / 1024:>8.1f} {uss / 1024:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Load test: sync gunicorn workers vs the ASGI front (asgi.py)
+
+Starts each server with the same number of worker processes and runs the
+same mixed load against it for a fixed time: many clients posting cheap
+/generate-plan requests while a few clients keep posting large, distinct
+/export-pdf requests (no PDF cache hits). Reports throughput and latency
+percentiles per request kind. With sync workers a plan request waits
+whenever every worker is busy rendering; under asgi.py it runs inline on
+the event loop while renders run on the export pool.
+
+Before the load, each server is checked to accept a chunked (no
+Content-Length) /generate-plans upload.
+
+Usage:
+    python -m benchmarks.bench_serving_modes [--workers 2] [--seconds 15]
+        [--plan-clients 32] [--export-clients 4]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+from planner import generate_study_plan
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCORES = ['4.0', '4.5', '5.0', '5.5', '6.0', '6.5']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, workers):
+    if mode == 'sync':
+        command = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+                   '-w', str(workers), '-b', f'127.0.0.1:{port}', 'app:app']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port),
+                   '--workers', str(workers), '--no-access-log']
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    server = subprocess.Popen(command, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            conn.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def check_chunked_upload(mode, port):
+    """Post a chunked /generate-plans body; raises if it is not answered in full"""
+    items = [{'current_score': score, 'target_score': '7.5', 'hours_daily': '2',
+              'test_type': 'academic', 'num_weeks': 4} for score in SCORES]
+    body = json.dumps(items).encode()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        conn.request('POST', '/generate-plans', iter((body[:64], body[64:])),
+                     {'Content-Type': 'application/json'}, encode_chunked=True)
+        response = conn.getresponse()
+        lines = response.read().splitlines()
+    finally:
+        conn.close()
+    if response.status != 200 or len(lines) != len(items):
+        raise RuntimeError(f"{mode} server answered a chunked upload with "
+                           f"{response.status} and {len(lines)} of {len(items)} plans")
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def client(port, make_request, stop, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    count = 0
+    while not stop.is_set():
+        method, path, body, headers = make_request(count)
+        count += 1
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body, headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def plan_request(worker):
+    def make(count):
+        form = {'current_score': SCORES[count % len(SCORES)], 'target_score': '7.5',
+                'hours_daily': str(1 + (worker + count) % 8), 'test_type': 'academic',
+                'num_weeks': '12'}
+        return ('POST', '/generate-plan', urllib.parse.urlencode(form),
+                {'Content-Type': 'application/x-www-form-urlencoded'})
+    return make
+
+
+def export_request(worker):
+    plan = generate_study_plan('5.0', '7.5', '4', 'academic', 52)
+
+    def make(count):
+        # A unique date makes every body distinct, so nothing is cached
+        body = json.dumps(dict(plan, generated_date=f'{worker}-{count}-{time.time()}'))
+        return 'POST', '/export-pdf', body, {'Content-Type': 'application/json'}
+    return make
+
+
+def run(mode, args):
+    port = free_port()
+    server = start_server(mode, port, args.workers)
+    try:
+        check_chunked_upload(mode, port)
+    except Exception:
+        server.terminate()
+        raise
+    stop = threading.Event()
+    results = {'plan': ([], []), 'export': ([], [])}
+    threads = []
+    for kind, clients, factory in (('plan', args.plan_clients, plan_request),
+                                   ('export', args.export_clients, export_request)):
+        latencies, errors = results[kind]
+        for worker in range(clients):
+            threads.append(threading.Thread(
+                target=client, args=(port, factory(worker), stop, latencies, errors), daemon=True
+            ))
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=120)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    for kind, (latencies, errors) in results.items():
+        print(f"{mode:<6} {kind:<7} {len(latencies) / args.seconds:>8.1f} "
+              f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.99) * 1000:>8.1f} {len(errors):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--plan-clients', type=int, default=32)
+    parser.add_argument('--export-clients', type=int, default=4)
+    parser.add_argument('--modes', default='sync,asgi')
+    args = parser.parse_args()
+
+    print(f"{args.workers} worker processes, {args.plan_clients} plan clients, "
+          f"{args.export_clients} export clients, {args.seconds:g} s (cpus: {os.cpu_count()})")
+    print(f"{'mode':<6} {'kind':<7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode in args.modes.split(','):
+        run(mode, args)
+
+
+if __name__ == '__main__':
+    main()
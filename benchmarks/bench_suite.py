@@ -0,0 +1,303 @@
+"""
+Benchmark suite: planners and exporters over the input grid
+
+Sweeps weeks x daily hours x test type and measures, per function and per
+endpoint (through Flask's test client):
+
+    min_ms, median_ms   wall time per call over --repeat samples; fast
+                        calls are looped so each sample lasts >= 50 ms
+    peak_kib            tracemalloc peak during one call
+    blocks              memory blocks allocated by one call and still held
+                        while its result is alive (sys.getallocatedblocks)
+
+Memory is measured in separate calls, so tracing does not skew the times.
+The app-level planner is measured with an empty plan cache, and PDF
+exports with PDF caching off, so every call does the full work.
+
+Results are written as JSON; compare mode re-runs the suite (or reads a
+second results file) and flags every case whose min_ms or peak_kib grew
+by more than --threshold over the baseline, exiting 1 if there are any.
+Baselines are only comparable on the same host; on shared or
+single-CPU machines, where identical runs differ by 30% or more, raise
+--threshold or compare peak_kib only (--metrics peak_kib).
+
+Usage:
+    python -m benchmarks.bench_suite run [-o benchmarks/baselines/baseline.json]
+        [--weeks 1,4,12] [--hours 1,4,8] [--test-types academic,general]
+        [--repeat 5] [--only render_plan_pdf,POST /export-pdf]
+    python -m benchmarks.bench_suite compare BASELINE [RESULTS] [--threshold 0.10]
+        [--metrics min_ms,peak_kib]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import app
+from pdf_cache import PdfCache
+from pdf_export import render_plan_pdf
+from planner import generate_study_plan, plan_cache
+from study_plan_logic import generate_study_plan as generate_hourly_plan
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'baselines', 'baseline.json')
+
+# Metrics checked by compare mode
+COMPARED_METRICS = ('min_ms', 'peak_kib')
+
+HOURLY_TEST_FORMATS = {'academic': 'Academic', 'general': 'General Training'}
+
+
+def plan_form(case):
+    return {'current_score': '5.5', 'target_score': '7.0', 'hours_daily': str(case['hours']),
+            'test_type': case['test_type'], 'num_weeks': str(case['weeks'])}
+
+
+def app_plan(case):
+    form = plan_form(case)
+    return generate_study_plan(form['current_score'], form['target_score'],
+                               form['hours_daily'], form['test_type'], case['weeks'])
+
+
+def cold_app_plan(case):
+    def call():
+        plan_cache.clear()
+        return app_plan(case)
+    return call
+
+
+def hourly_plan(case):
+    test_format = HOURLY_TEST_FORMATS[case['test_type']]
+    return lambda: generate_hourly_plan(test_format, 5.5, 7.0, case['hours'], case['weeks'])
+
+
+def plan_text(case):
+    plan = app_plan(case)
+    return lambda: app.render_plan_text(plan)
+
+
+def plan_pdf(case):
+    plan = app_plan(case)
+    return lambda: render_plan_pdf(plan).getvalue()
+
+
+def endpoint(method, path, body=None, form=None):
+    client = app.app.test_client()
+
+    def call():
+        response = client.open(path, method=method, data=body if form is None else form,
+                               content_type=None if form is not None else 'application/json')
+        data = response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"{method} {path} answered {response.status_code}")
+        return data
+    return call
+
+
+def generate_endpoint(case):
+    return endpoint('POST', '/generate-plan', form=plan_form(case))
+
+
+def export_endpoint(path):
+    def setup(case):
+        return endpoint('POST', path, body=json.dumps(app_plan(case)))
+    return setup
+
+
+# Benchmark name -> setup(case) returning the zero-argument call to measure
+TARGETS = {
+    'planner.generate_study_plan': cold_app_plan,
+    'study_plan_logic.generate_study_plan': hourly_plan,
+    'render_plan_text': plan_text,
+    'render_plan_pdf': plan_pdf,
+    'POST /generate-plan': generate_endpoint,
+    'POST /export-text': export_endpoint('/export-text'),
+    'POST /export-pdf': export_endpoint('/export-pdf'),
+}
+
+
+def case_key(name, case):
+    return f"{name} weeks={case['weeks']} hours={case['hours']} test_type={case['test_type']}"
+
+
+def time_call(call, repeat, min_sample=0.05):
+    """
+    Per-call times in ms: each of the repeat samples loops the call
+    (timeit-style, with gc off) until it lasts at least min_sample seconds
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_sample:
+            break
+        number *= 2 if elapsed * 2 >= min_sample else 10
+
+    times = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                call()
+            times.append((time.perf_counter() - started) * 1000 / number)
+    finally:
+        gc.enable()
+    return times
+
+
+def measure(call, repeat):
+    call()  # warm-up: imports, fonts, cached templates
+    times = time_call(call, repeat)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    result = call()
+    blocks = sys.getallocatedblocks() - blocks
+    del result
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'min_ms': round(min(times), 3),
+        'median_ms': round(statistics.median(times), 3),
+        'peak_kib': round(peak / 1024, 1),
+        'blocks': blocks
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    # Every export call renders; the module's cache would serve repeats
+    app.pdf_cache = PdfCache(max_bytes=0)
+    names = args.only.split(',') if args.only else list(TARGETS)
+    unknown = set(names) - set(TARGETS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    cases = [{'weeks': weeks, 'hours': hours, 'test_type': test_type}
+             for weeks in parse_ints(args.weeks)
+             for hours in parse_ints(args.hours)
+             for test_type in args.test_types.split(',')]
+
+    results = {}
+    for name in names:
+        for case in cases:
+            key = case_key(name, case)
+            results[key] = measure(TARGETS[name](case), args.repeat)
+            print(f"{key:<72} {results[key]['min_ms']:>10.3f} ms {results[key]['peak_kib']:>10.1f} KiB",
+                  flush=True)
+
+    return {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+
+
+def compare(baseline, current, threshold, metrics=COMPARED_METRICS):
+    """Return (key, metric, old, new, change) for every regression"""
+    regressions = []
+    for key, old in baseline['results'].items():
+        new = current['results'].get(key)
+        if new is None:
+            continue
+        for metric in metrics:
+            if old[metric] <= 0:
+                continue
+            change = new[metric] / old[metric] - 1
+            if change > threshold:
+                regressions.append((key, metric, old[metric], new[metric], change))
+    return regressions
+
+
+def write_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def parse_ints(text):
+    return [int(value) for value in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the suite and write the results')
+    run.add_argument('-o', '--output', default=DEFAULT_BASELINE)
+
+    check = commands.add_parser('compare', help='compare results against a baseline')
+    check.add_argument('baseline')
+    check.add_argument('results', nargs='?',
+                       help='results file to check (default: run the suite now)')
+    check.add_argument('--threshold', type=float, default=0.10,
+                       help='allowed relative increase (default 0.10 = 10%%)')
+    check.add_argument('--metrics', default=','.join(COMPARED_METRICS),
+                       help='comma-separated metrics to check')
+    check.add_argument('-o', '--output', help='also write the new results here')
+
+    for command in (run, check):
+        command.add_argument('--weeks', default='1,4,12')
+        command.add_argument('--hours', default='1,4,8')
+        command.add_argument('--test-types', default='academic,general')
+        command.add_argument('--repeat', type=int, default=5)
+        command.add_argument('--only', help='comma-separated benchmark names')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_suite(args)
+        write_results(results, args.output)
+        print(f"Wrote {len(results['results'])} results to {args.output}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.results:
+        with open(args.results) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args)
+        if args.output:
+            write_results(current, args.output)
+
+    regressions = compare(baseline, current, args.threshold, args.metrics.split(','))
+    for key, metric, old, new, change in regressions:
+        print(f"REGRESSION {key}: {metric} {old} -> {new} (+{change:.0%})")
+    checked = len(set(baseline['results']) & set(current['results']))
+    print(f"{checked} cases compared, {len(regressions)} regressions "
+          f"(threshold {args.threshold:.0%})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
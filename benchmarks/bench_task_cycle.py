@@ -0,0 +1,70 @@
+"""
+Benchmark: study_plan_logic slot assignment across the (hours, weeks) grid
+
+For every daily_hours x total_weeks combination the UI allows, compares the
+previous slot assignment (iterating over a materialized task list repeated
+once per slot) with study_plan_logic.generate_study_plan, checks that the
+task order is identical and reports time and tracemalloc peak memory.
+
+Usage:
+    python -m benchmarks.bench_task_cycle [--format Academic|"General Training"]
+"""
+import argparse
+import time
+import tracemalloc
+
+from study_plan_logic import generate_study_plan
+
+DAYS_PER_WEEK = 7
+
+
+def legacy_task_order(tasks, daily_hours, total_weeks):
+    """Slot assignment as previously implemented"""
+    task_cycle = iter(tasks * (daily_hours * total_weeks * DAYS_PER_WEEK))
+    return [next(task_cycle) for _ in range(daily_hours * total_weeks * DAYS_PER_WEEK)]
+
+
+def plan_task_order(plan):
+    return [slot['Task'] for week in plan.values() for day in week.values() for slot in day]
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--format', default='Academic')
+    args = parser.parse_args()
+
+    # The largest plan uses every task, so its first cycle is the task pool
+    tasks = list(dict.fromkeys(plan_task_order(generate_study_plan(args.format, 5.5, 7.0, 8, 12))))
+
+    # "legacy list" is only the task list the previous version materialized;
+    # "plan" is the whole current generate_study_plan call
+    print(f"{'hours':>5} {'weeks':>5} {'legacy list ms':>15} {'legacy list KiB':>16} "
+          f"{'plan ms':>9} {'plan KiB':>9}")
+    for daily_hours in range(1, 9):
+        for total_weeks in range(1, 13):
+            plan, plan_time, plan_peak = measure(
+                lambda: generate_study_plan(args.format, 5.5, 7.0, daily_hours, total_weeks)
+            )
+            order = plan_task_order(plan)
+            _, legacy_time, legacy_peak = measure(
+                lambda: iter(tasks * (daily_hours * total_weeks * DAYS_PER_WEEK))
+            )
+            assert order == legacy_task_order(tasks, daily_hours, total_weeks), \
+                (daily_hours, total_weeks)
+            print(f"{daily_hours:>5} {total_weeks:>5} {legacy_time * 1000:>15.3f} "
+                  f"{legacy_peak / 1024:>16.1f} {plan_time * 1000:>9.3f} {plan_peak / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Application configuration loaded from environment variables
+"""
+import os
+
+# ─── Plan Cache ────────────────────────────────────────────────────────
+# Maximum number of distinct plan bodies kept in memory per worker
+PLAN_CACHE_SIZE = int(os.environ.get('PLAN_CACHE_SIZE', 512))
+# Seconds before a cached plan body is rebuilt (0 disables expiry)
+PLAN_CACHE_TTL = float(os.environ.get('PLAN_CACHE_TTL', 3600))
+
+# ─── Plan Store ────────────────────────────────────────────────────────
+# 'memory' (per-worker LRU) or 'sqlite:///path/to/plans.db'
+PLAN_STORE = os.environ.get('PLAN_STORE', 'memory')
+# Maximum number of plans kept by the in-memory store
+PLAN_STORE_SIZE = int(os.environ.get('PLAN_STORE_SIZE', 1024))
+# Seconds a stored plan stays available for export (0 keeps plans forever)
+PLAN_STORE_TTL = float(os.environ.get('PLAN_STORE_TTL', 86400))
+
+# ─── PDF Cache ─────────────────────────────────────────────────────────
+# Memory budget for rendered PDFs per worker, in bytes
+PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# Directory that receives PDFs evicted from memory (empty disables spilling)
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', '')
+
+# ─── PDF Spooling ──────────────────────────────────────────────────────
+# ZIP archives of batch PDF exports larger than this are spooled to a
+# temporary file
+PDF_SPOOL_MAX_BYTES = int(os.environ.get('PDF_SPOOL_MAX_BYTES', 1024 * 1024))
+
+# ─── Week Pagination ───────────────────────────────────────────────────
+# Weeks returned per page by lazy plans and /plans/<id>/weeks
+PLAN_PAGE_SIZE = int(os.environ.get('PLAN_PAGE_SIZE', 4))
+# Upper bound for ?limit=
+PLAN_PAGE_MAX = int(os.environ.get('PLAN_PAGE_MAX', 52))
+
+# ─── Bulk Generation ───────────────────────────────────────────────────
+# Maximum number of plans per /generate-plans request
+BULK_PLAN_MAX = int(os.environ.get('BULK_PLAN_MAX', 1000))
+
+# ─── Batch PDF Export ──────────────────────────────────────────────────
+# Worker processes rendering batch exports (0 uses one per CPU)
+PDF_POOL_WORKERS = int(os.environ.get('PDF_POOL_WORKERS', 0))
+# multiprocessing start method for those workers
+PDF_POOL_START_METHOD = os.environ.get('PDF_POOL_START_METHOD', 'spawn')
+# Maximum number of plans per /export-pdfs request
+PDF_BATCH_MAX = int(os.environ.get('PDF_BATCH_MAX', 100))
+
+# ─── Background PDF Jobs ───────────────────────────────────────────────
+# 'memory' (per-worker) or 'sqlite:///path/to/jobs.db' (shared by workers)
+PDF_JOB_STORE = os.environ.get('PDF_JOB_STORE', 'memory')
+# Maximum number of jobs kept by the in-memory job store
+PDF_JOB_STORE_SIZE = int(os.environ.get('PDF_JOB_STORE_SIZE', 256))
+# Seconds a job and its document stay available (0 keeps them forever)
+PDF_JOB_TTL = float(os.environ.get('PDF_JOB_TTL', 3600))
+# Renders that may be waiting per worker before ?async=1 answers 503
+PDF_JOB_MAX_PENDING = int(os.environ.get('PDF_JOB_MAX_PENDING', 16))
+
+# ─── ASGI Serving ──────────────────────────────────────────────────────
+# Threads running exports and bulk generation under asgi.py
+ASGI_EXPORT_WORKERS = int(os.environ.get('ASGI_EXPORT_WORKERS', 2))
+# Offloaded requests running or waiting before asgi.py answers 503
+ASGI_EXPORT_MAX_PENDING = int(os.environ.get('ASGI_EXPORT_MAX_PENDING', 32))
+
+# ─── Plan Index ────────────────────────────────────────────────────────
+# Index file built by `python plan_index.py <path>` ('' generates live)
+PLAN_INDEX_PATH = os.environ.get('PLAN_INDEX_PATH', '')
+
+# ─── Metrics ───────────────────────────────────────────────────────────
+# 'memory' (per-worker) or 'sqlite:///path/to/metrics.db' (summed over workers)
+METRICS_STORE = os.environ.get('METRICS_STORE', 'memory')
+# Seconds a process buffers observations before adding them to a shared store
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+
+# ─── Request Profiling ─────────────────────────────────────────────────
+# Profile one in N requests (0 only profiles requests that ask for it)
+PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+# X-Admin-Token value for X-Profile: 1 requests and /admin/profiles ('' disables both)
+PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN', '')
+# 'cprofile' (pstats files) or 'sample' (collapsed stacks)
+PROFILE_MODE = os.environ.get('PROFILE_MODE', 'cprofile')
+# Seconds between stack samples in 'sample' mode
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', 0.005))
+# Directory for profile files ('' uses <tmp>/ielts-profiles)
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '')
+# Newest profile files kept
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 100))
+
+# ─── JSON Fragments ────────────────────────────────────────────────────
+# Shared structures (cached weeks, resources) whose encoded JSON is kept per worker
+JSON_FRAGMENT_CACHE_SIZE = int(os.environ.get('JSON_FRAGMENT_CACHE_SIZE', 1024))
+# Memory budget for the encoded JSON of shared structures per worker, in bytes
+JSON_FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get('JSON_FRAGMENT_CACHE_MAX_BYTES', 16 * 1024 * 1024))
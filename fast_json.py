@@ -0,0 +1,235 @@
+"""
+Fast JSON encoding with pre-encoded fragments
+
+FastEncoder writes the same bytes as json.dumps(obj, ensure_ascii=True,
+sort_keys=True, separators=(',', ':')), the format of Flask's compact
+jsonify(), but:
+
+- values are encoded with orjson when it is installed. Its output is only
+  used where it cannot differ from the stdlib encoder: values with
+  non-ASCII or DEL characters, floats the two write differently (exponent
+  notation, NaN and infinities, which orjson writes as null) and anything
+  orjson rejects are encoded again by the stdlib encoder;
+- dicts that hold other dicts (the response, the plan, weekly_plan, each
+  week) are walked, and each container below them is encoded once per
+  call, so the day schedule shared by every week of a plan is spliced in
+  instead of being encoded once per week;
+- containers registered with fragments.share() keep their encoded bytes
+  across calls. They must not be mutated afterwards; the planner shares
+  the weekly resources and the weeks of every cached plan body.
+"""
+import json
+import re
+import threading
+from collections import OrderedDict
+from json.encoder import encode_basestring_ascii
+
+import config
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+if orjson is not None:
+    # Types orjson writes differently (datetimes, dataclasses, subclasses
+    # of str, dict, ...) are passed to default() like the stdlib does
+    ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME |
+                      orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+# Exponents as orjson writes them ('1e16', '2.5e-7'); the pattern starts
+# with a literal, so the search is fast and does not copy the output
+ORJSON_EXPONENT = re.compile(rb'e[-0-9](?<=[0-9]e[-0-9])')
+
+# Dicts nested deeper are encoded whole (which also leaves circular
+# references to the stdlib encoder to report)
+MAX_WALK_DEPTH = 16
+
+
+class FragmentCache:
+    """
+    Encoded JSON of shared, read-only containers, by identity
+
+    share() registers a container; its bytes are stored the first time it
+    is encoded. Entries hold a reference to their container, so its id
+    cannot be reused while it is cached. Least recently used entries are
+    dropped beyond max_entries or max_bytes of encoded JSON.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def share(self, obj):
+        """Register a container that will not be mutated; returns it"""
+        if self.max_entries > 0 and self.max_bytes > 0:
+            with self._lock:
+                if id(obj) not in self._entries:
+                    self._entries[id(obj)] = (obj, None)
+                    self._evict()
+        return obj
+
+    def lookup(self, obj):
+        """(shared, data) for obj; data is None until it has been stored"""
+        with self._lock:
+            entry = self._entries.get(id(obj))
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(id(obj))
+            if entry[1] is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return True, entry[1]
+
+    def store(self, obj, data):
+        """Keep the encoded bytes of a shared container"""
+        with self._lock:
+            entry = self._entries.get(id(obj))
+            if entry is None or entry[1] is not None:
+                return
+            self._entries[id(obj)] = (obj, data)
+            self._bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, data) = self._entries.popitem(last=False)
+            self._bytes -= len(data) if data is not None else 0
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current occupancy"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class FastEncoder:
+    """
+    Encodes values to compact, sorted, ASCII-only JSON bytes
+
+    default is called for types JSON has no encoding for, as in json.dumps.
+    """
+
+    def __init__(self, default=None, fragments=None):
+        self.default = default
+        self.fragments = fragments
+        self._stdlib = json.JSONEncoder(ensure_ascii=True, sort_keys=True,
+                                        separators=(',', ':'), default=default)
+
+    def encode(self, obj, suffix=b''):
+        """Return the JSON bytes of obj, followed by suffix"""
+        parts = []
+        self._encode(obj, parts, {}, 0)
+        parts.append(suffix)
+        return b''.join(parts)
+
+    def _encode(self, obj, parts, memo, depth):
+        kind = type(obj)
+        if kind is not dict and kind is not list:
+            parts.append(self.encode_value(obj))
+            return
+        # memo holds the containers already encoded in this call; they are
+        # all alive (reachable from the root), so their ids are unique
+        data = memo.get(id(obj))
+        if data is not None:
+            parts.append(data)
+            return
+        shared, data = self.fragments.lookup(obj) if self.fragments is not None else (False, None)
+        if data is None and kind is dict and depth < MAX_WALK_DEPTH and _has_nested_dicts(obj):
+            # Walked dicts go straight into parts; only a shared one is
+            # joined, to be stored
+            start = len(parts)
+            self._encode_dict(obj, parts, memo, depth)
+            if shared:
+                parts[start:] = [b''.join(parts[start:])]
+                self.fragments.store(obj, parts[start])
+            return
+        if data is None:
+            data = self.encode_value(obj)
+            if shared:
+                self.fragments.store(obj, data)
+        memo[id(obj)] = data
+        parts.append(data)
+
+    def _encode_dict(self, obj, parts, memo, depth):
+        # Only called for non-empty dicts
+        separator = b'{'
+        for key in sorted(obj):
+            parts.append(separator)
+            parts.append(encode_basestring_ascii(key).encode('ascii'))
+            parts.append(b':')
+            self._encode(obj[key], parts, memo, depth + 1)
+            separator = b','
+        parts.append(b'}')
+
+    def encode_value(self, obj):
+        """Encode obj in one go, with orjson when its output is the same"""
+        if orjson is not None and _ascii_strings(obj):
+            try:
+                data = orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+            except TypeError:  # orjson.JSONEncodeError; the stdlib encoder decides
+                pass
+            else:
+                if _same_as_stdlib(data):
+                    return data
+        return self._stdlib.encode(obj).encode('ascii')
+
+
+def _ascii_strings(obj):
+    # Values whose own strings are not ASCII would be encoded twice (e.g.
+    # the text export's content), so they skip orjson; nested ones are
+    # left to _same_as_stdlib()
+    kind = type(obj)
+    if kind is str:
+        return obj.isascii()
+    if kind is dict:
+        obj = obj.values()
+    elif kind is not list:
+        return True
+    return all(type(value) is not str or value.isascii() for value in obj)
+
+
+def _same_as_stdlib(data):
+    # orjson output can differ for non-ASCII text, DEL, NaN and
+    # infinities (null) and floats below 1e-4 or in exponent notation.
+    # Matches inside strings only cost a second encoding.
+    return (data.isascii() and b'\x7f' not in data and b'null' not in data
+            and b'0.0000' not in data and not ORJSON_EXPONENT.search(data))
+
+
+def _has_nested_dicts(obj):
+    # Only dicts with string keys are walked; others keep the stdlib's
+    # key conversion and errors
+    has_dicts = False
+    for key, value in obj.items():
+        if type(key) is not str:
+            return False
+        if type(value) is dict:
+            has_dicts = True
+    return has_dicts
+
+
+# Shared by the app's JSON provider and the planner
+fragments = FragmentCache(config.JSON_FRAGMENT_CACHE_SIZE, config.JSON_FRAGMENT_CACHE_MAX_BYTES)
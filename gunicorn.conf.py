@@ -0,0 +1,63 @@
+"""
+gunicorn settings
+
+The app is loaded once in the master (preload_app) and warm_up() builds
+the read-only catalogs there: day templates, the PDF theme and reportlab.
+gc.freeze() then moves everything allocated so far out of the collector's
+reach, so collections in the forked workers do not write to (and un-share)
+those pages.
+
+gunicorn runs one worker unless WEB_CONCURRENCY (or -w) says otherwise.
+Plans and PDF jobs are kept per process by default, so more workers need
+the shared stores (PLAN_STORE and PDF_JOB_STORE set to sqlite:///...);
+each worker also starts its own PDF pool of PDF_POOL_WORKERS processes.
+Metrics default to a SQLite store shared by this server's processes, so
+/metrics reports the totals of all workers whichever one answers.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+import gc
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+preload_app = True
+
+# One metrics file per server run, removed on exit; set before the
+# preloaded app reads its config
+METRICS_DB = os.path.join(tempfile.gettempdir(), f'ielts-metrics-{os.getpid()}.db')
+os.environ.setdefault('METRICS_STORE', f'sqlite:///{METRICS_DB}')
+
+# No collections in the master while the shared state is built; the config
+# is read before the preloaded app is imported
+gc.disable()
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported, before forking
+    import config
+    from app import warm_up
+
+    warm_up()
+    gc.freeze()
+    gc.enable()
+
+    if server.cfg.workers > 1:
+        per_process = [name for name in ('PLAN_STORE', 'PDF_JOB_STORE')
+                       if getattr(config, name) in ('', 'memory')]
+        if per_process:
+            print(f"Warning: {server.cfg.workers} workers with per-process "
+                  f"{', '.join(per_process)}; plan and job URLs will only work "
+                  "on the worker that created them")
+
+
+def on_exit(server):
+    # Flush first, or the exit-time flush would create the file again
+    from metrics import metrics
+
+    metrics.flush()
+    try:
+        os.remove(METRICS_DB)
+    except OSError:
+        pass
@@ -0,0 +1,293 @@
+"""
+Prometheus metrics for requests and the phases of the hot paths
+
+Counters and histograms are kept as additive samples (one per histogram
+bucket, plus _sum and _count), so the samples of several processes are
+combined by adding them up. Each process buffers its observations and
+adds them to a metrics store chosen with the METRICS_STORE setting:
+
+    memory                      this process only (default)
+    sqlite:///path/metrics.db   summed over every gunicorn worker (and PDF
+                                pool process) on the host; gunicorn.conf.py
+                                sets one up per server run
+
+With a shared store, a worker's buffer is added at most
+METRICS_FLUSH_INTERVAL seconds after an observation. Counts of workers
+that have exited stay in the store, as counters should.
+
+Phases are timed with phase(), e.g.
+
+    with phase('pdf_layout'):
+        doc.build(...)
+"""
+import atexit
+import bisect
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+
+import config
+from sqlite_connections import SQLiteConnections
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SIZE_BUCKETS = tuple(1024 * 2 ** power for power in range(3, 13))  # 8 KiB .. 4 MiB
+
+# name -> (type, help, buckets)
+METRICS = {
+    'ielts_http_requests_total': (
+        'counter', 'HTTP requests by route, method and status', None),
+    'ielts_http_request_duration_seconds': (
+        'histogram', 'Time to produce the response by route and method', LATENCY_BUCKETS),
+    'ielts_phase_duration_seconds': (
+        'histogram', 'Time spent in a phase of plan generation or export', LATENCY_BUCKETS),
+    'ielts_pdf_size_bytes': (
+        'histogram', 'Size of rendered PDF documents', SIZE_BUCKETS),
+}
+
+
+def format_labels(labels):
+    """Prometheus label set text for a dict, in a stable order"""
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in sorted(labels.items())
+    )
+
+
+def bucket_label_text(label_text, bound):
+    """Labels of a histogram bucket; le always comes last"""
+    return f'{label_text},le="{format_value(bound)}"' if label_text else f'le="{format_value(bound)}"'
+
+
+def sample_line(sample, labels, value):
+    return f'{sample}{{{labels}}} {format_value(value)}' if labels else f'{sample} {format_value(value)}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsStore(ABC):
+    """
+    Interface shared by all metrics store backends
+
+    Samples are keyed on (sample name, label text) and only ever added to.
+    """
+
+    @abstractmethod
+    def add(self, samples):
+        """Add a {(sample, labels): value} dict to the stored values"""
+
+    @abstractmethod
+    def collect(self):
+        """Return all stored samples as {(sample, labels): value}"""
+
+
+class MemoryMetricsStore(MetricsStore):
+    """
+    In-process sample totals
+    """
+
+    def __init__(self):
+        self._samples = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, samples):
+        with self._lock:
+            for key, value in samples.items():
+                self._samples[key] += value
+
+    def collect(self):
+        with self._lock:
+            return dict(self._samples)
+
+
+class SQLiteMetricsStore(MetricsStore):
+    """
+    SQLite-backed totals shared by every process using the same file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connect = SQLiteConnections(path).connect
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS metrics ('
+                ' sample TEXT NOT NULL,'
+                ' labels TEXT NOT NULL,'
+                ' value REAL NOT NULL,'
+                ' PRIMARY KEY (sample, labels))'
+            )
+
+    def add(self, samples):
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT INTO metrics (sample, labels, value) VALUES (?, ?, ?)'
+                ' ON CONFLICT (sample, labels) DO UPDATE SET value = value + excluded.value',
+                [(sample, labels, value) for (sample, labels), value in samples.items()]
+            )
+
+    def collect(self):
+        rows = self._connect().execute('SELECT sample, labels, value FROM metrics').fetchall()
+        return {(sample, labels): value for sample, labels, value in rows}
+
+
+def create_metrics_store(url):
+    """
+    Build a metrics store from a METRICS_STORE setting
+    """
+    if not url or url == 'memory':
+        return MemoryMetricsStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteMetricsStore(url[len('sqlite:///'):])
+    raise ValueError(f"Unsupported METRICS_STORE: {url}")
+
+
+class Metrics:
+    """
+    Records observations into a per-process buffer and flushes it to store
+
+    With flush_interval 0 the buffer is only flushed by render() and at
+    exit, which is all a per-process store needs. Forked
+    children start with an empty buffer (and memory store), so
+    observations made in the gunicorn master before forking, e.g. by
+    warm-up, are not counted once per worker.
+    """
+
+    def __init__(self, store, flush_interval=5):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._label_texts = {}
+        self._bucket_texts = {}
+        self._reset()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset(self):
+        self._pending = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    def _after_fork(self):
+        # The parent's lock may have been held by its flusher thread
+        self._reset()
+        if isinstance(self.store, MemoryMetricsStore):
+            self.store = MemoryMetricsStore()
+
+    def _buffer(self):
+        # Called with the lock held
+        if self._flusher is None and self.flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+        return self._pending
+
+    def _label_text(self, labels):
+        # Label sets repeat (routes, phases), so their text is cached
+        key = tuple(labels.items())
+        text = self._label_texts.get(key)
+        if text is None:
+            text = self._label_texts[key] = format_labels(labels)
+        return text
+
+    def inc(self, name, labels, amount=1):
+        key = (name, self._label_text(labels))
+        with self._lock:
+            self._buffer()[key] += amount
+
+    def observe(self, name, labels, value):
+        """Add one observation to a histogram"""
+        buckets = METRICS[name][2]
+        label_text = self._label_text(labels)
+        position = bisect.bisect_left(buckets, value)
+        bound = buckets[position] if position < len(buckets) else float('inf')
+        bucket_key = (label_text, bound)
+        bucket_labels = self._bucket_texts.get(bucket_key)
+        if bucket_labels is None:
+            bucket_labels = self._bucket_texts[bucket_key] = bucket_label_text(label_text, bound)
+        with self._lock:
+            pending = self._buffer()
+            pending[(name + '_bucket', bucket_labels)] += 1
+            pending[(name + '_sum', label_text)] += value
+            pending[(name + '_count', label_text)] += 1
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as a phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('ielts_phase_duration_seconds', {'phase': name},
+                         time.perf_counter() - started)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Add buffered observations to the store"""
+        with self._lock:
+            if not self._pending:
+                return
+            samples, self._pending = self._pending, defaultdict(float)
+        try:
+            self.store.add(samples)
+        except sqlite3.Error as e:
+            print("Metrics flush error:", str(e))
+            with self._lock:
+                for key, value in samples.items():
+                    self._pending[key] += value
+
+    def render(self):
+        """Collect every process's samples as Prometheus text format"""
+        self.flush()
+        samples = self.store.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (sample, labels), value in sorted(samples.items()):
+                    if sample == name:
+                        lines.append(sample_line(name, labels, value))
+                continue
+            lines.extend(_histogram_lines(name, buckets, samples))
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name, buckets, samples):
+    # Buckets are stored per interval; the exposition format wants them
+    # cumulative, ending with +Inf (= _count)
+    lines = []
+    for (sample, labels), count in sorted(samples.items()):
+        if sample != name + '_count':
+            continue
+        cumulative = 0
+        for bound in buckets + (float('inf'),):
+            bucket_labels = bucket_label_text(labels, bound)
+            cumulative += samples.get((name + '_bucket', bucket_labels), 0)
+            lines.append(sample_line(name + '_bucket', bucket_labels, cumulative))
+        lines.append(sample_line(name + '_sum', labels, samples[(name + '_sum', labels)]))
+        lines.append(sample_line(name + '_count', labels, count))
+    return lines
+
+
+def create_metrics(url, flush_interval=5):
+    """
+    Build the metrics recorder for a METRICS_STORE setting; only shared
+    stores are flushed periodically
+    """
+    store = create_metrics_store(url)
+    return Metrics(store, 0 if isinstance(store, MemoryMetricsStore) else flush_interval)
+
+
+# Shared by the app, the planner and the PDF exporter
+metrics = create_metrics(config.METRICS_STORE, config.METRICS_FLUSH_INTERVAL)
+atexit.register(metrics.flush)
+phase = metrics.phase
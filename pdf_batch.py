@@ -0,0 +1,139 @@
+"""
+Parallel PDF rendering for batch exports
+
+reportlab layout is pure Python and CPU-bound, so batch exports are spread
+over a process pool instead of the request thread. Pool workers import
+reportlab, build the PDF theme and render a small warm-up plan when they
+start, so the first real render in each worker does not pay for it.
+
+The pool is created on first use and shared by the whole process;
+multiprocessing is only imported then.
+"""
+import atexit
+import os
+import threading
+import zipfile
+
+import config
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker():
+    """Process pool initializer: import and exercise the PDF stack once"""
+    from pdf_export import get_pdf_theme, render_plan_pdf
+    from planner import generate_study_plan
+
+    theme = get_pdf_theme()
+    render_plan_pdf(generate_study_plan('5.5', '7.0', '1', 'academic', 1), theme)
+
+
+def _render(plan_data):
+    """Render one plan in a pool worker; returns (pdf_bytes, error)"""
+    from pdf_export import render_plan_pdf
+
+    try:
+        return render_plan_pdf(plan_data).getvalue(), None
+    except Exception as e:
+        return None, str(e)
+
+
+def get_pdf_pool():
+    """
+    Return the shared, warmed PDF process pool (created on first use)
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool._broken:
+            # A worker died (e.g. killed for memory); replace the pool
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            workers = config.PDF_POOL_WORKERS or os.cpu_count() or 1
+            # A fresh interpreter per worker is safe to start from a
+            # threaded server, unlike fork
+            context = multiprocessing.get_context(config.PDF_POOL_START_METHOD)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=context, initializer=_warm_worker
+            )
+            atexit.register(shutdown_pdf_pool)
+        return _pool
+
+
+def shutdown_pdf_pool():
+    """Stop the pool's worker processes"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def submit_plan_pdf(plan_data):
+    """
+    Queue one render on the shared pool; the future's result is
+    (pdf_bytes, error) as for render_plan_pdfs()
+    """
+    return get_pdf_pool().submit(_render, plan_data)
+
+
+def render_plan_pdfs(plans, pool=None):
+    """
+    Render plans in parallel, yielding (pdf_bytes, error) in input order
+
+    error is None for a successful render and the error message otherwise.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    shared = pool is None
+    pool = pool or get_pdf_pool()
+    try:
+        yield from pool.map(_render, plans)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        if shared:
+            shutdown_pdf_pool()
+        raise
+
+
+def plan_pdf_name(index):
+    """File name of a plan's PDF inside a batch export"""
+    return f"IELTS_StudyPlan_{index + 1:04d}.pdf"
+
+
+def write_pdf_zip(documents, output):
+    """
+    Write (name, pdf_bytes) pairs to output as a ZIP archive
+
+    PDF pages are already compressed, so members are stored as-is.
+    """
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, pdf_bytes in documents:
+            archive.writestr(name, pdf_bytes)
+    return output
+
+
+def export_plan_pdfs(plans, directory, pool=None):
+    """
+    Render plans in parallel into one PDF file per plan in directory
+
+    Returns the list of written paths; plans that fail to render raise
+    RuntimeError after the others have been written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths, errors = [], []
+    for index, (pdf_bytes, error) in enumerate(render_plan_pdfs(plans, pool)):
+        if error is not None:
+            errors.append(f"plan {index}: {error}")
+            continue
+        path = os.path.join(directory, plan_pdf_name(index))
+        with open(path, 'wb') as f:
+            f.write(pdf_bytes)
+        paths.append(path)
+    if errors:
+        raise RuntimeError("; ".join(errors))
+    return paths
@@ -0,0 +1,123 @@
+"""
+Content-addressed cache for rendered PDF exports
+
+Rendered documents are keyed on a hash of the plan body without its
+generated_date, so repeated exports of the same plan skip reportlab layout.
+Entries live in memory up to a byte budget; when a spill directory is
+configured, entries evicted from memory are written there and read back on
+the next hit.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def pdf_cache_key(plan_data):
+    """
+    Return the content hash of a plan, ignoring generated_date.
+
+    Key order is kept because the PDF lays weeks and days out in dict order.
+    """
+    body = {key: value for key, value in plan_data.items() if key != 'generated_date'}
+    encoded = json.dumps(body, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class PdfCache:
+    """
+    Thread-safe LRU of PDF bytes bounded by total size, with optional disk spill
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, spill_dir=None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.spill_dir = spill_dir or None
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.pdf")
+
+    def get(self, key):
+        """Return cached PDF bytes for key, or None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), 'rb') as spilled:
+                    data = spilled.read()
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self.set(key, data)
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, data):
+        """Store PDF bytes under key, evicting (and spilling) older entries"""
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            if len(data) <= self.max_bytes:
+                self._entries[key] = data
+                self._size += len(data)
+            else:
+                evicted.append((key, data))
+            while self._size > self.max_bytes:
+                old_key, old_data = self._entries.popitem(last=False)
+                self._size -= len(old_data)
+                self.evictions += 1
+                evicted.append((old_key, old_data))
+
+        if self.spill_dir:
+            for old_key, old_data in evicted:
+                self._spill(old_key, old_data)
+
+    def _spill(self, key, data):
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            return
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and memory usage"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'spill_dir': self.spill_dir,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,349 @@
+"""
+PDF export for study plans
+
+The reportlab theme (paragraph styles, table style, colors and the page
+header/footer drawing) is built once per worker by get_pdf_theme() and
+shared read-only by every render; only the flowables are built per plan.
+"""
+import functools
+import io
+
+from reportlab.lib import colors
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from metrics import metrics, phase
+from plan_model import as_plan_model
+
+RESOURCES_TEXT = """
+    <b>SparkSkyTech Resources:</b><br/>
+    • Comprehensive IELTS preparation materials<br/>
+    • Free practice tests and mock exams<br/>
+    • Expert strategies and tips<br/>
+    • Visit: <link href="https://www.sparkskytech.com/ielts">www.sparkskytech.com/ielts</link><br/><br/>
+
+    <b>Official IELTS Resources:</b><br/>
+    • Official practice materials and sample tests<br/>
+    • Test format and scoring information<br/>
+    • Registration and test center details<br/><br/>
+
+    <b>Additional Practice:</b><br/>
+    • British Council IELTS preparation courses<br/>
+    • Online mock tests and practice exercises<br/>
+    • Mobile apps for daily vocabulary building
+    """
+
+TIPS_TEXT = """
+    • <b>Consistency is key:</b> Study regularly even if for shorter periods<br/>
+    • <b>Track your progress:</b> Keep a study journal and note improvements<br/>
+    • <b>Practice under timed conditions:</b> Simulate real exam environment<br/>
+    • <b>Focus on weak areas:</b> Spend extra time on challenging skills<br/>
+    • <b>Use official materials:</b> Supplement with authentic IELTS content<br/>
+    • <b>Get feedback:</b> Have your writing and speaking assessed by experts
+    """
+
+
+class ProfessionalCanvas(canvas.Canvas):
+    """
+    Canvas that decorates every page with the theme header and footer
+
+    Pages are decorated as they are finished. The "Page X of Y" label is a
+    per-page form XObject that is referenced right away but only defined in
+    save(), once the page count is known, so no page state is retained.
+    """
+
+    def __init__(self, *args, pdf_theme=None, generated_date='', **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self.pdf_theme = pdf_theme or get_pdf_theme()
+        self.generated_date = generated_date
+        self.page_count = 0
+
+    def showPage(self):
+        self.page_count += 1
+        self.pdf_theme.draw_page_elements(self, self.page_count, self.generated_date)
+        canvas.Canvas.showPage(self)
+
+    def save(self):
+        for page_num in range(1, self.page_count + 1):
+            self.beginForm(page_label_form(page_num))
+            self.pdf_theme.draw_page_label(self, page_num, self.page_count)
+            self.endForm()
+        canvas.Canvas.save(self)
+
+
+def page_label_form(page_num):
+    """Name of the form XObject holding the page number label"""
+    return f"PageLabel{page_num}"
+
+
+class PdfTheme:
+    """
+    Styles, colors and page decorations shared by all PDF exports
+    """
+
+    page_size = letter
+    canvas_class = ProfessionalCanvas
+
+    def __init__(self):
+        # Brand colors
+        self.primary_color = HexColor("#667eea")
+        self.secondary_color = HexColor("#764ba2")
+        self.rule_color = HexColor("#e2e8f0")
+        self.panel_color = HexColor("#f8fafc")
+
+        # Paragraph styles
+        styles = getSampleStyleSheet()
+
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=self.primary_color,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+
+        self.section_style = ParagraphStyle(
+            'SectionHeader',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=self.secondary_color,
+            spaceAfter=15,
+            spaceBefore=20,
+            fontName='Helvetica-Bold',
+            borderWidth=1,
+            borderColor=self.rule_color,
+            borderPadding=8,
+            backColor=self.panel_color
+        )
+
+        self.week_style = ParagraphStyle(
+            'WeekHeader',
+            parent=styles['Heading3'],
+            fontSize=14,
+            textColor=self.primary_color,
+            spaceAfter=12,
+            spaceBefore=15,
+            fontName='Helvetica-Bold'
+        )
+
+        self.normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=6,
+            leading=16,
+            fontName='Helvetica'
+        )
+
+        self.bullet_style = ParagraphStyle(
+            'BulletStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=4,
+            leading=14,
+            leftIndent=20,
+            fontName='Helvetica'
+        )
+
+        # Overview table
+        self.overview_col_widths = [2*inch, 3*inch]
+        self.overview_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), self.primary_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 11),
+            ('GRID', (0, 0), (-1, -1), 1, colors.lightgrey),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, self.panel_color])
+        ])
+
+    def canvasmaker(self, generated_date):
+        """
+        Return a canvas factory for SimpleDocTemplate.build()
+        """
+        return functools.partial(self.canvas_class, pdf_theme=self, generated_date=generated_date)
+
+    def draw_page_label(self, canv, page_num, total_pages):
+        """
+        Draw the "Page X of Y" label (top right)
+        """
+        width, height = self.page_size
+        canv.setFont("Helvetica", 10)
+        canv.setFillColor(colors.gray)
+        canv.drawRightString(width - 50, height - 50, f"Page {page_num} of {total_pages}")
+
+    def draw_page_elements(self, canv, page_num, generated_date):
+        """
+        Draw the header and footer on the current page
+
+        The page number label is placed by reference; its form is defined
+        by the canvas once the total page count is known.
+        """
+        width, height = self.page_size
+
+        # Header
+        canv.setFont("Helvetica-Bold", 16)
+        canv.setFillColor(self.primary_color)
+        canv.drawCentredString(width/2, height - 50, "IELTS Smart Study Plan")
+
+        # Subheader
+        canv.setFont("Helvetica", 12)
+        canv.setFillColor(self.secondary_color)
+        canv.drawCentredString(width/2, height - 70, "by SparkSkyTech")
+
+        # Page number (top right)
+        canv.doForm(page_label_form(page_num))
+
+        # Footer with clickable links
+        footer_y = 50
+
+        # Company name
+        canv.setFont("Helvetica-Bold", 11)
+        canv.setFillColor(self.primary_color)
+        canv.drawString(50, footer_y + 20, "SparkSkyTech - IELTS Study Plan Generator")
+
+        # Website link (clickable)
+        canv.setFont("Helvetica", 10)
+        canv.setFillColor(colors.blue)
+        canv.drawString(50, footer_y, "Visit: www.sparkskytech.com/ielts")
+        canv.linkURL("https://www.sparkskytech.com/ielts",
+                     (50, footer_y - 5, 200, footer_y + 10))
+
+        # Generation date (right side)
+        canv.setFont("Helvetica", 9)
+        canv.setFillColor(colors.gray)
+        canv.drawRightString(width - 50, footer_y, f"Generated: {generated_date}")
+
+        # Separator line
+        canv.setStrokeColor(self.rule_color)
+        canv.setLineWidth(0.5)
+        canv.line(50, height - 90, width - 50, height - 90)  # Top line
+        canv.line(50, footer_y + 35, width - 50, footer_y + 35)   # Bottom line
+
+
+@functools.lru_cache(maxsize=None)
+def get_pdf_theme():
+    """
+    Return the per-process PDF theme, building it on first use
+    """
+    return PdfTheme()
+
+
+def build_plan_flowables(plan_data, theme):
+    """
+    Build the reportlab flowables for a study plan
+    """
+    content = []
+
+    # Title Section
+    content.append(Paragraph("Your Personalized Study Plan", theme.title_style))
+    content.append(Spacer(1, 20))
+
+    plan = as_plan_model(plan_data)
+
+    # Overview Table
+    overview_data = [
+        ['<b>Current Score:</b>', plan.current_score],
+        ['<b>Target Score:</b>', plan.target_score],
+        ['<b>Test Type:</b>', plan.test_type.title()],
+        ['<b>Duration:</b>', plan.duration],
+        ['<b>Daily Hours:</b>', f"{plan.hours_daily} hours"],
+        ['<b>Intensity Level:</b>', plan.intensity]
+    ]
+
+    overview_table = Table(overview_data, colWidths=theme.overview_col_widths)
+    overview_table.setStyle(theme.overview_table_style)
+
+    content.append(overview_table)
+    content.append(Spacer(1, 30))
+
+    # Weekly Plans
+    content.append(Paragraph("Weekly Study Schedule", theme.section_style))
+
+    # Bullet markup per shared day template; Paragraphs themselves hold
+    # layout state and are created fresh for every occurrence
+    slots_markup = {}
+
+    for week in plan.weeks:
+        content.append(Paragraph(f"{week.name}", theme.week_style))
+        content.append(Paragraph(f"<b>Focus:</b> {week.focus}", theme.normal_style))
+        content.append(Spacer(1, 10))
+
+        # Daily schedule
+        for day in week.days:
+            content.append(Paragraph(f"<b>{day.name}:</b>", theme.normal_style))
+
+            markup = slots_markup.get(id(day.slots))
+            if markup is None:
+                markup = []
+                for slot in day.slots:
+                    markup.append(f"• <b>{slot.skill}:</b> {slot.duration}")
+
+                    # Add specific activities if available
+                    if slot.activities is not None:
+                        for task in slot.activities[:2]:  # Limit to 2 tasks for space
+                            markup.append(f"  - {task}")
+                slots_markup[id(day.slots)] = markup
+
+            for text in markup:
+                content.append(Paragraph(text, theme.bullet_style))
+
+            content.append(Spacer(1, 8))
+
+        # Weekly goals
+        if week.goals:
+            content.append(Paragraph("<b>Weekly Goals:</b>", theme.normal_style))
+            for goal in week.goals:
+                content.append(Paragraph(f"• {goal}", theme.bullet_style))
+
+        content.append(Spacer(1, 20))
+
+    # Resources Section
+    content.append(Paragraph("Recommended Resources", theme.section_style))
+    content.append(Paragraph(RESOURCES_TEXT, theme.normal_style))
+
+    # Success tips
+    content.append(Spacer(1, 20))
+    content.append(Paragraph("Success Tips", theme.week_style))
+    content.append(Paragraph(TIPS_TEXT, theme.normal_style))
+
+    return content
+
+
+def render_plan_pdf(plan_data, theme=None):
+    """
+    Render a study plan as a professional PDF with clickable footer and page numbers
+
+    Returns a BytesIO positioned at the start of the document.
+    """
+    theme = theme or get_pdf_theme()
+    buffer = io.BytesIO()
+
+    # Create document with custom canvas
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=theme.page_size,
+        topMargin=120,  # More space for header
+        bottomMargin=100,  # More space for footer
+        leftMargin=60,
+        rightMargin=60
+    )
+
+    with phase('pdf_flowables'):
+        flowables = build_plan_flowables(plan_data, theme)
+
+    # Build PDF with custom canvas
+    with phase('pdf_layout'):
+        doc.build(flowables, canvasmaker=theme.canvasmaker(plan_data['generated_date']))
+    metrics.observe('ielts_pdf_size_bytes', {}, buffer.tell())
+    buffer.seek(0)
+
+    return buffer
@@ -0,0 +1,253 @@
+"""
+Background PDF export jobs
+
+POST /export-pdf?async=1 queues the render on the shared PDF process pool
+(pdf_batch) and answers at once with a job ID; clients poll /jobs/<id> and
+download /jobs/<id>/result when it is done, so a slow render never holds a
+web worker. Job state and finished documents are kept in a job store
+chosen with the PDF_JOB_STORE setting:
+
+    memory                     per-worker LRU (default)
+    sqlite:///path/jobs.db     SQLite file shared by all workers on a host,
+                               so any worker can answer a poll
+
+The renders themselves always run in the pool of the worker that accepted
+the job.
+"""
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from functools import partial
+
+from pdf_batch import submit_plan_pdf
+from pdf_cache import pdf_cache_key
+from plan_cache import PlanCache
+from sqlite_connections import SQLiteConnections
+
+JOB_QUEUED = 'queued'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class QueueFull(Exception):
+    """Raised when too many jobs are already waiting in this worker"""
+
+
+def new_job_id():
+    """Return a fresh, URL-safe job ID"""
+    return uuid.uuid4().hex
+
+
+class JobStore(ABC):
+    """
+    Interface shared by all job store backends
+
+    Job records are dicts with job_id, status, created_at, finished_at,
+    error and etag; the rendered document is stored separately.
+    """
+
+    @abstractmethod
+    def save(self, job, result=None):
+        """Store a new job record (and its document, if already rendered)"""
+
+    @abstractmethod
+    def finish(self, job_id, status, result=None, error=None):
+        """Mark a job as done (with its document) or failed (with an error)"""
+
+    @abstractmethod
+    def get(self, job_id):
+        """Return the job record, or None if it is unknown or expired"""
+
+    @abstractmethod
+    def get_result(self, job_id):
+        """Return the rendered document of a finished job, or None"""
+
+
+class MemoryJobStore(JobStore):
+    """
+    In-process LRU store for job records and documents
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self._cache = PlanCache(max_entries, ttl)
+        self._lock = threading.Lock()
+
+    def save(self, job, result=None):
+        self._cache.set(job['job_id'], (dict(job), result))
+
+    def finish(self, job_id, status, result=None, error=None):
+        with self._lock:
+            entry = self._cache.get(job_id)
+            if entry is None:
+                return
+            job = dict(entry[0], status=status, error=error, finished_at=time.time())
+            self._cache.set(job_id, (job, result))
+
+    def get(self, job_id):
+        entry = self._cache.get(job_id)
+        return dict(entry[0]) if entry is not None else None
+
+    def get_result(self, job_id):
+        entry = self._cache.get(job_id)
+        return entry[1] if entry is not None else None
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed store; expired jobs are deleted when new ones are saved
+    """
+
+    def __init__(self, path, ttl=3600):
+        self.path = path
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._connect = SQLiteConnections(path).connect
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS pdf_jobs ('
+                ' job_id TEXT PRIMARY KEY,'
+                ' status TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' finished_at REAL,'
+                ' error TEXT,'
+                ' etag TEXT,'
+                ' result BLOB)'
+            )
+            # Every insert deletes expired rows by created_at
+            conn.execute('CREATE INDEX IF NOT EXISTS pdf_jobs_created_at ON pdf_jobs (created_at)')
+
+    def save(self, job, result=None):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO pdf_jobs (job_id, status, created_at, finished_at, error, etag, result)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job['job_id'], job['status'], job['created_at'], job['finished_at'],
+                 job['error'], job['etag'], result)
+            )
+            if self.ttl is not None:
+                conn.execute('DELETE FROM pdf_jobs WHERE created_at < ?',
+                             (job['created_at'] - self.ttl,))
+
+    def finish(self, job_id, status, result=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE pdf_jobs SET status = ?, finished_at = ?, error = ?, result = ?'
+                ' WHERE job_id = ?',
+                (status, time.time(), error, result, job_id)
+            )
+
+    def _expired(self, created_at):
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, job_id):
+        row = self._connect().execute(
+            'SELECT status, created_at, finished_at, error, etag FROM pdf_jobs WHERE job_id = ?',
+            (job_id,)
+        ).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+        status, created_at, finished_at, error, etag = row
+        return {'job_id': job_id, 'status': status, 'created_at': created_at,
+                'finished_at': finished_at, 'error': error, 'etag': etag}
+
+    def get_result(self, job_id):
+        row = self._connect().execute(
+            'SELECT created_at, result FROM pdf_jobs WHERE job_id = ?', (job_id,)
+        ).fetchone()
+        if row is None or self._expired(row[0]):
+            return None
+        return row[1]
+
+    def stats(self):
+        (count,) = self._connect().execute('SELECT COUNT(*) FROM pdf_jobs').fetchone()
+        return {'size': count, 'ttl': self.ttl}
+
+
+def create_job_store(url, max_entries=256, ttl=3600):
+    """
+    Build a job store from a PDF_JOB_STORE setting
+    """
+    if not url or url == 'memory':
+        return MemoryJobStore(max_entries, ttl)
+    if url.startswith('sqlite:///'):
+        return SQLiteJobStore(url[len('sqlite:///'):], ttl)
+    raise ValueError(f"Unsupported PDF_JOB_STORE: {url}")
+
+
+class PdfJobQueue:
+    """
+    Queues PDF renders on the process pool and records their outcome
+
+    At most max_pending jobs may wait in this worker at once; further
+    submissions raise QueueFull. Finished documents also go into
+    pdf_cache, and plans already in it complete immediately.
+    """
+
+    def __init__(self, store, pdf_cache, max_pending=16):
+        self.store = store
+        self.pdf_cache = pdf_cache
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, plan_data):
+        """Queue a render of plan_data and return the new job record"""
+        etag = pdf_cache_key(plan_data)
+        job = {'job_id': new_job_id(), 'status': JOB_QUEUED, 'created_at': time.time(),
+               'finished_at': None, 'error': None, 'etag': etag}
+
+        pdf_bytes = self.pdf_cache.get(etag)
+        if pdf_bytes is not None:
+            job.update(status=JOB_DONE, finished_at=job['created_at'])
+            self.store.save(job, pdf_bytes)
+            return job
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"Too many PDF exports in progress (limit {self.max_pending})")
+            self._pending += 1
+            self.submitted += 1
+
+        try:
+            self.store.save(job)
+            future = submit_plan_pdf(plan_data)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(partial(self._finish, job['job_id'], etag))
+        return job
+
+    def _finish(self, job_id, etag, future):
+        try:
+            pdf_bytes, error = future.result()
+        except Exception as e:
+            pdf_bytes, error = None, str(e) or e.__class__.__name__
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        if error is not None:
+            print("PDF Export Error:", error)
+            self.store.finish(job_id, JOB_FAILED, error=error)
+        else:
+            self.pdf_cache.set(etag, pdf_bytes)
+            self.store.finish(job_id, JOB_DONE, result=pdf_bytes)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def stats(self):
+        return {
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            'submitted': self.submitted,
+            'rejected': self.rejected
+        }
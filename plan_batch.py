@@ -0,0 +1,191 @@
+"""
+Columnar batch plan generation for whole cohorts
+
+generate_plan_batch() takes one sequence per planner input and computes the
+per-student values (score gap, intensity, minutes per skill and the week
+numbers where the focus phases end) column-wise, with numpy when it is
+installed and plain lists otherwise. Per-student plans are only built when
+they are requested from the returned PlanBatch, and equal for equal inputs
+to what planner.generate_study_plan() returns.
+"""
+try:
+    import numpy as np
+except ImportError:  # optional; the list-based columns are used instead
+    np = None
+
+from plan_model import Day, Plan, Slot, Week
+from planner import (
+    DAYS_OF_WEEK, SKILL_ALLOCATION, WEEKLY_RESOURCES, current_timestamp,
+    get_skill_activities, get_weekly_goals, normalize_plan_inputs
+)
+
+# Values of the intensity column index these labels
+INTENSITY_LEVELS = ('Low', 'Medium', 'High')
+
+# Week focus per phase, in order
+WEEK_PHASES = ('Foundation Building', 'Skill Development', 'Test Preparation & Practice')
+
+
+class PlanBatch:
+    """
+    Columnar study plans for a cohort
+
+    Input columns (current_score, target_score, hours_daily, test_type,
+    num_weeks) hold the normalized inputs; computed columns hold
+    score_gap, intensity (index into INTENSITY_LEVELS), minutes (skill ->
+    column of minutes per day), foundation_end and development_end (the
+    last week of the first two focus phases). Columns are numpy arrays when
+    numpy is available and lists otherwise.
+    """
+
+    def __init__(self, columns, generated_date=None):
+        self.columns = columns
+        self.generated_date = generated_date or current_timestamp()
+        self._size = len(columns['num_weeks'])
+        # Day templates and weekly goals shared (read-only) by students with
+        # the same daily schedule / target score
+        self._days = {}
+        self._goals = {}
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self.plan(index)
+
+    def intensity_label(self, index):
+        return INTENSITY_LEVELS[int(self.columns['intensity'][index])]
+
+    def days(self, index):
+        """Return the (shared) day template for one student"""
+        minutes = tuple(int(self.columns['minutes'][skill][index]) for skill in SKILL_ALLOCATION)
+        test_type = self.columns['test_type'][index]
+        key = (minutes, test_type)
+        days = self._days.get(key)
+        if days is None:
+            slots = tuple(
+                Slot(skill.title(), f"{time_allocated} minutes",
+                     tuple(get_skill_activities(skill, test_type, time_allocated)))
+                for skill, time_allocated in zip(SKILL_ALLOCATION, minutes)
+                if time_allocated > 0
+            )
+            days = self._days[key] = tuple(Day(day, slots) for day in DAYS_OF_WEEK)
+        return days
+
+    def plan_model(self, index):
+        """Expand one student's plan into a plan_model.Plan"""
+        columns = self.columns
+        num_weeks = int(columns['num_weeks'][index])
+        target_score = columns['target_score'][index]
+        foundation_end = int(columns['foundation_end'][index])
+        development_end = int(columns['development_end'][index])
+        days = self.days(index)
+        # Keyed by type too: goals quote the score, and 7 and 7.0 read differently
+        goals_key = (target_score, type(target_score))
+        goals = self._goals.get(goals_key)
+        if goals is None:
+            goals = self._goals[goals_key] = get_weekly_goals(None, target_score)
+
+        weeks = []
+        for week in range(1, num_weeks + 1):
+            phase = 0 if week <= foundation_end else 1 if week <= development_end else 2
+            weeks.append(Week(
+                f'Week {week}',
+                days,
+                focus=WEEK_PHASES[phase],
+                goals=goals,
+                resources=WEEKLY_RESOURCES
+            ))
+
+        return Plan(
+            weeks,
+            current_score=columns['current_score'][index],
+            target_score=target_score,
+            test_type=columns['test_type'][index],
+            duration=f"{num_weeks} weeks",
+            hours_daily=columns['hours_daily'][index],
+            intensity=self.intensity_label(index),
+            generated_date=self.generated_date
+        )
+
+    def plan(self, index):
+        """Expand one student's plan into the /generate-plan dict shape"""
+        return self.plan_model(index).to_dict()
+
+
+def generate_plan_batch(current_scores, target_scores, hours_daily, test_types, num_weeks,
+                        generated_date=None, use_numpy=None):
+    """
+    Compute plans for a cohort, one sequence entry per student
+
+    Inputs are normalized and validated like generate_study_plan()'s
+    (ValueError for scores, hours or week counts that are not numbers).
+    use_numpy=None uses numpy when it is installed.
+    """
+    rows = list(zip(current_scores, target_scores, hours_daily, test_types, num_weeks))
+    if any(len(column) != len(rows) for column in
+           (current_scores, target_scores, hours_daily, test_types, num_weeks)):
+        raise ValueError("All input columns must have the same length")
+
+    params = [normalize_plan_inputs(*row) for row in rows]
+    columns = {
+        'current_score': [row[0] for row in params],
+        'target_score': [row[1] for row in params],
+        'hours_daily': [row[2] for row in params],
+        'test_type': [row[3] for row in params],
+        'num_weeks': [row[4] for row in params],
+    }
+
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise RuntimeError("numpy is not installed")
+
+    compute = _compute_numpy if use_numpy else _compute_lists
+    columns.update(compute(columns))
+    return PlanBatch(columns, generated_date)
+
+
+def _compute_numpy(columns):
+    size = len(columns['num_weeks'])
+    current = np.fromiter((float(v) for v in columns['current_score']), dtype=np.float64, count=size)
+    target = np.fromiter((float(v) for v in columns['target_score']), dtype=np.float64, count=size)
+    hours = np.fromiter((int(v) for v in columns['hours_daily']), dtype=np.int64, count=size)
+    weeks = np.asarray(columns['num_weeks'], dtype=np.int64)
+
+    score_gap = target - current
+    intensity = np.where(score_gap > 1.5, 2, np.where(score_gap > 0.5, 1, 0)).astype(np.int8)
+
+    # Same operation order as the planner, so float truncation matches
+    minutes = {skill: (hours * ratio * 60).astype(np.int64)
+               for skill, ratio in SKILL_ALLOCATION.items()}
+
+    return {
+        'score_gap': score_gap,
+        'intensity': intensity,
+        'minutes': minutes,
+        'foundation_end': weeks // 3,
+        'development_end': 2 * weeks // 3,
+    }
+
+
+def _compute_lists(columns):
+    current = [float(v) for v in columns['current_score']]
+    target = [float(v) for v in columns['target_score']]
+    hours = [int(v) for v in columns['hours_daily']]
+    weeks = columns['num_weeks']
+
+    score_gap = [t - c for c, t in zip(current, target)]
+    intensity = [2 if gap > 1.5 else 1 if gap > 0.5 else 0 for gap in score_gap]
+
+    minutes = {skill: [int(h * ratio * 60) for h in hours]
+               for skill, ratio in SKILL_ALLOCATION.items()}
+
+    return {
+        'score_gap': score_gap,
+        'intensity': intensity,
+        'minutes': minutes,
+        'foundation_end': [w // 3 for w in weeks],
+        'development_end': [2 * w // 3 for w in weeks],
+    }
@@ -0,0 +1,79 @@
+"""
+Bounded LRU/TTL cache for generated study plan bodies
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class PlanCache:
+    """
+    Thread-safe least-recently-used cache with optional time-to-live.
+
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=512, ttl=3600):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None when absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key, building it with factory() on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry; counters are kept"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current occupancy"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
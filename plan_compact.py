@@ -0,0 +1,129 @@
+"""
+Compact study plan format
+
+Weeks of a generated plan repeat the same day schedule, goals and resources,
+so the compact form stores each distinct template once and lets weeks refer
+to it by id:
+
+    {
+        ...plan overview fields...,
+        'format': 'compact',
+        'templates': {
+            'days': {'d0': [...activities...]},
+            'schedules': {'s0': {'Monday': 'd0', ...}},
+            'goals': {'g0': [...]},
+            'resources': {'r0': {...}}
+        },
+        'weekly_plan': {
+            'Week 1': {'focus': '...', 'daily_schedule': 's0',
+                       'goals': 'g0', 'resources': 'r0'},
+            ...
+        }
+    }
+
+expand_plan() turns it back into the regular plan shape.
+"""
+import json
+
+COMPACT_FORMAT = 'compact'
+COMPACT_MIMETYPE = 'application/vnd.ielts-plan.compact+json'
+
+
+class _TemplateTable:
+    """
+    Assigns one id per distinct template value
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.templates = {}
+        self._by_identity = {}
+        self._by_content = {}
+
+    def ref(self, value):
+        # Generated plans share template objects, so identity is the fast path;
+        # plans parsed from JSON fall back to comparing content. Entries keep
+        # their value alive, so its id cannot be reused by another object.
+        entry = self._by_identity.get(id(value))
+        if entry is not None:
+            return entry[1]
+        content_key = json.dumps(value, sort_keys=True)
+        ref = self._by_content.get(content_key)
+        if ref is None:
+            ref = f"{self.prefix}{len(self.templates)}"
+            self._by_content[content_key] = ref
+            self.templates[ref] = value
+        self._by_identity[id(value)] = (value, ref)
+        return ref
+
+
+def wants_compact_plan(req):
+    """
+    Return True when the request opted into the compact plan format
+    """
+    if req.args.get('format') == COMPACT_FORMAT:
+        return True
+    return any(mimetype == COMPACT_MIMETYPE for mimetype, _ in req.accept_mimetypes)
+
+
+def compact_plan(plan):
+    """
+    Convert a plan into the compact template/reference format
+    """
+    days = _TemplateTable('d')
+    schedules = _TemplateTable('s')
+    goals = _TemplateTable('g')
+    resources = _TemplateTable('r')
+
+    weekly_plan = {}
+    for week_name, details in plan['weekly_plan'].items():
+        week = {'focus': details['focus']}
+        if 'daily_schedule' in details:
+            schedule = {day: days.ref(activities)
+                        for day, activities in details['daily_schedule'].items()}
+            week['daily_schedule'] = schedules.ref(schedule)
+        if 'goals' in details:
+            week['goals'] = goals.ref(details['goals'])
+        if 'resources' in details:
+            week['resources'] = resources.ref(details['resources'])
+        weekly_plan[week_name] = week
+
+    compact = {key: value for key, value in plan.items() if key != 'weekly_plan'}
+    compact['format'] = COMPACT_FORMAT
+    compact['templates'] = {
+        'days': days.templates,
+        'schedules': schedules.templates,
+        'goals': goals.templates,
+        'resources': resources.templates
+    }
+    compact['weekly_plan'] = weekly_plan
+    return compact
+
+
+def expand_plan(compact):
+    """
+    Rebuild the regular plan shape from a compact plan.
+
+    Plans that are not compact are returned unchanged.
+    """
+    if compact.get('format') != COMPACT_FORMAT:
+        return compact
+
+    templates = compact['templates']
+    weekly_plan = {}
+    for week_name, ref in compact['weekly_plan'].items():
+        week = {'focus': ref['focus']}
+        if 'daily_schedule' in ref:
+            schedule = templates['schedules'][ref['daily_schedule']]
+            week['daily_schedule'] = {day: templates['days'][day_ref]
+                                      for day, day_ref in schedule.items()}
+        if 'goals' in ref:
+            week['goals'] = templates['goals'][ref['goals']]
+        if 'resources' in ref:
+            week['resources'] = templates['resources'][ref['resources']]
+        weekly_plan[week_name] = week
+
+    plan = {key: value for key, value in compact.items()
+            if key not in ('format', 'templates', 'weekly_plan')}
+    plan['weekly_plan'] = weekly_plan
+    return plan
@@ -0,0 +1,264 @@
+"""
+Precomputed plan index over the whole form input domain
+
+The planner form only offers a small, finite set of inputs (scores 3.0-9.0
+in 0.5 steps, 1-8 daily hours, 1-12 weeks, Academic/General), so every
+plan body /generate-plan can return is built offline into one read-only
+file. Workers memory-map it, so all of them share its pages, and serve a
+plan by joining its JSON segments around a fresh generated_date.
+
+Whole scores come in two spellings ("7" from the sliders, "7.0" from the
+dropdowns) and plans echo the spelling back, so both are covered: 76,800
+plans. Their JSON is only a few thousand distinct segments (plan heads,
+week keys and week bodies), stored once each; per plan the file keeps the
+list of segment ids ("recipe") to join. File layout:
+
+    magic     8 bytes, INDEX_MAGIC
+    header    uint32 length + JSON: domain values per input, counts and
+              the offset of the recipe table
+    segments  uint32 offsets (count + 1), then the segment bytes
+    recipes   uint32 offsets (entries + 1), then uint16 segment ids;
+              TIMESTAMP marks where generated_date goes
+
+Offsets are little-endian and relative to the end of the header.
+
+Entries are numbered by the position of each input in the domain lists,
+so lookups need no search. Inputs outside the domain are not in the index
+and are generated live.
+
+Build:
+    python plan_index.py plan_index.bin
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+from planner import build_plan_body
+
+INDEX_MAGIC = b'IELTSPI1'
+
+# Recipe id standing for the generated_date string
+TIMESTAMP = 0xFFFF
+
+
+def _score_spellings():
+    scores = []
+    for halves in range(6, 19):
+        score = halves / 2
+        scores.append(str(score))
+        if score.is_integer():
+            scores.append(str(int(score)))
+    return tuple(scores)
+
+
+# Planner inputs covered by the index, in normalize_plan_inputs() order
+INDEX_DOMAIN = (
+    _score_spellings(),
+    _score_spellings(),
+    tuple(str(hours) for hours in range(1, 9)),
+    ('academic', 'general'),
+    tuple(range(1, 13)),
+)
+
+
+def encode_json(value):
+    """Serialize like Flask's jsonify() (sorted keys, ASCII, compact)"""
+    return json.dumps(value, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode()
+
+
+def plan_recipe(body, segment_id):
+    """
+    Split a plan body's JSON (with generated_date) into segment ids
+
+    segment_id(bytes) returns the id of a segment, adding it if new. Each
+    week body is one segment; the text between them is cut at the
+    generated_date value.
+    """
+    recipe = []
+    text = [b'{']
+    keys = sorted(set(body) | {'generated_date'})
+    for position, key in enumerate(keys):
+        if position:
+            text.append(b',')
+        text.append(encode_json(key) + b':')
+        if key == 'generated_date':
+            text.append(b'"')
+            recipe.append(segment_id(b''.join(text)))
+            recipe.append(TIMESTAMP)
+            text = [b'"']
+        elif key == 'weekly_plan':
+            weekly_plan = body[key]
+            text.append(b'{')
+            for number, name in enumerate(sorted(weekly_plan)):
+                if number:
+                    text.append(b',')
+                text.append(encode_json(name) + b':')
+                recipe.append(segment_id(b''.join(text)))
+                recipe.append(segment_id(encode_json(weekly_plan[name])))
+                text = []
+            text.append(b'}')
+        else:
+            text.append(encode_json(body[key]))
+    text.append(b'}')
+    recipe.append(segment_id(b''.join(text)))
+    return recipe
+
+
+def build_plan_index(path):
+    """
+    Build the index file at path; returns its size in bytes
+    """
+    segments = {}
+
+    def segment_id(data):
+        sid = segments.get(data)
+        if sid is None:
+            sid = segments[data] = len(segments)
+            if sid >= TIMESTAMP:
+                raise ValueError("Too many distinct plan segments for the index")
+        return sid
+
+    recipe_offsets = array('I', [0])
+    recipe_ids = array('H')
+    for params in _domain_params():
+        recipe_ids.extend(plan_recipe(build_plan_body(*params), segment_id))
+        recipe_offsets.append(len(recipe_ids) * 2)
+
+    # Offsets are relative to the end of the header
+    segment_offsets = array('I', [4 * (len(segments) + 1)])
+    for data in segments:
+        segment_offsets.append(segment_offsets[-1] + len(data))
+    recipe_table = segment_offsets[-1]
+    recipe_data = recipe_table + 4 * len(recipe_offsets)
+    recipe_offsets = array('I', (recipe_data + offset for offset in recipe_offsets))
+    header = encode_json({
+        'domain': INDEX_DOMAIN,
+        'segments': len(segments),
+        'entries': len(recipe_offsets) - 1,
+        'recipe_table': recipe_table
+    })
+
+    if sys.byteorder != 'little':
+        for table in (segment_offsets, recipe_offsets, recipe_ids):
+            table.byteswap()
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(segment_offsets.tobytes())
+        for data in segments:
+            f.write(data)
+        f.write(recipe_offsets.tobytes())
+        f.write(recipe_ids.tobytes())
+    os.replace(temp_path, path)
+    return os.path.getsize(path)
+
+
+def _domain_params():
+    current_scores, target_scores, hours, test_types, weeks = INDEX_DOMAIN
+    for current_score in current_scores:
+        for target_score in target_scores:
+            for hours_daily in hours:
+                for test_type in test_types:
+                    for num_weeks in weeks:
+                        yield current_score, target_score, hours_daily, test_type, num_weeks
+
+
+class PlanIndex:
+    """
+    Read-only, memory-mapped view of an index file
+
+    render() returns the JSON of the plan for normalized inputs, or None
+    when they are outside the index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a plan index")
+        start = len(INDEX_MAGIC) + 4
+        (header_size,) = struct.unpack_from('<I', self._map, len(INDEX_MAGIC))
+        header = json.loads(self._map[start:start + header_size])
+        self._view = memoryview(self._map)[start + header_size:]
+        self._recipe_table = header['recipe_table']
+        self._positions = [{value: position for position, value in enumerate(values)}
+                           for values in header['domain']]
+        self.entries = header['entries']
+        self.segments = header['segments']
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, params, generated_date):
+        """JSON bytes of the plan for normalize_plan_inputs() params, or None"""
+        entry = 0
+        for value, positions in zip(params, self._positions):
+            position = positions.get(value)
+            if position is None:
+                self.misses += 1
+                return None
+            entry = entry * len(positions) + position
+
+        view = self._view
+        start, stop = struct.unpack_from('<2I', view, self._recipe_table + 4 * entry)
+        stamp = encode_json(generated_date)[1:-1]
+        parts = []
+        for segment in struct.unpack_from(f'<{(stop - start) // 2}H', view, start):
+            if segment == TIMESTAMP:
+                parts.append(stamp)
+            else:
+                begin, end = struct.unpack_from('<2I', view, 4 * segment)
+                parts.append(view[begin:end])
+        self.hits += 1
+        return b''.join(parts)
+
+    def verify(self):
+        """
+        Check sample entries against the live planner; raises ValueError if
+        the index was built from a different version of it
+        """
+        samples = list(_domain_params())
+        for params in (samples[0], samples[len(samples) // 2], samples[-1]):
+            expected = encode_json(dict(build_plan_body(*params), generated_date=''))
+            if self.render(params, '') != expected:
+                raise ValueError(f"{self.path} is out of date; rebuild it with plan_index.py")
+        self.hits -= 3
+
+    def stats(self):
+        return {
+            'entries': self.entries,
+            'segments': self.segments,
+            'size': len(self._map),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def open_plan_index(path):
+    """
+    Open and verify the index at path; None (live generation) when no
+    path is configured or the file is missing or stale
+    """
+    if not path:
+        return None
+    try:
+        plan_index = PlanIndex(path)
+        plan_index.verify()
+    except (OSError, ValueError) as e:
+        print("Plan index disabled:", str(e))
+        return None
+    return plan_index
+
+
+if __name__ == '__main__':
+    output = sys.argv[1] if len(sys.argv) > 1 else 'plan_index.bin'
+    started = time.perf_counter()
+    size = build_plan_index(output)
+    print(f"Wrote {output}: {size / (1024 * 1024):.1f} MiB in {time.perf_counter() - started:.1f} s")
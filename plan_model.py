@@ -0,0 +1,203 @@
+"""
+Typed study plan model
+
+The exporters read plans through these __slots__ classes, and the app
+planner builds its day templates and lazily served weeks from them.
+Plans that are returned as JSON-shaped dicts are built as dicts directly,
+so they do not pay for both shapes. Identical day templates are shared
+between days and weeks rather than copied, and serializers keep that
+sharing.
+
+    Plan -> Week -> Day -> Slot      (app planner: skill blocks)
+    Plan -> Week -> Day -> HourSlot  (study_plan_logic: hourly tasks)
+"""
+from collections import deque
+
+
+class Slot:
+    """One skill block of a study day"""
+    __slots__ = ('skill', 'duration', 'activities')
+
+    def __init__(self, skill, duration, activities=None):
+        self.skill = skill
+        self.duration = duration
+        self.activities = activities
+
+    def to_dict(self):
+        data = {'skill': self.skill, 'duration': self.duration}
+        if self.activities is not None:
+            data['activities'] = list(self.activities)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        activities = data.get('activities')
+        return cls(data['skill'], data['duration'],
+                   tuple(activities) if activities is not None else None)
+
+
+class HourSlot:
+    """One hour of a study day"""
+    __slots__ = ('hour', 'task', 'resources')
+
+    def __init__(self, hour, task, resources):
+        self.hour = hour
+        self.task = task
+        self.resources = resources
+
+    def to_dict(self):
+        return {"Hour": self.hour, "Task": self.task, "Resources": self.resources}
+
+
+class Day:
+    """A named day and its slots (the slots tuple may be shared)"""
+    __slots__ = ('name', 'slots')
+
+    def __init__(self, name, slots):
+        self.name = name
+        self.slots = slots
+
+
+class Week:
+    """A named week; days, goals and resources may be shared between weeks"""
+    __slots__ = ('name', 'days', 'focus', 'goals', 'resources')
+
+    def __init__(self, name, days, focus=None, goals=None, resources=None):
+        self.name = name
+        self.days = days
+        self.focus = focus
+        self.goals = goals
+        self.resources = resources
+
+    def to_dict(self, memo=None):
+        """
+        Serialize to a /generate-plan week entry
+
+        Weeks serialized with the same memo share one daily_schedule dict
+        (and slot lists) for shared day templates.
+        """
+        memo = {} if memo is None else memo
+        details = {'focus': self.focus, 'daily_schedule': schedule_dict(self.days, memo)}
+        if self.goals is not None:
+            details['goals'] = self.goals
+        if self.resources is not None:
+            details['resources'] = self.resources
+        return details
+
+
+class Plan:
+    """A generated study plan"""
+    __slots__ = ('current_score', 'target_score', 'test_type', 'duration',
+                 'hours_daily', 'intensity', 'weeks', 'generated_date')
+
+    def __init__(self, weeks, current_score=None, target_score=None, test_type=None,
+                 duration=None, hours_daily=None, intensity=None, generated_date=None):
+        self.weeks = weeks
+        self.current_score = current_score
+        self.target_score = target_score
+        self.test_type = test_type
+        self.duration = duration
+        self.hours_daily = hours_daily
+        self.intensity = intensity
+        self.generated_date = generated_date
+
+    def to_dict(self):
+        """
+        Serialize to the /generate-plan JSON shape
+
+        generated_date is omitted when it is None (cached plan bodies).
+        """
+        memo = {}
+        weekly_plan = {week.name: week.to_dict(memo) for week in self.weeks}
+
+        data = {
+            'current_score': self.current_score,
+            'target_score': self.target_score,
+            'test_type': self.test_type,
+            'duration': self.duration,
+            'hours_daily': self.hours_daily,
+            'intensity': self.intensity,
+            'weekly_plan': weekly_plan
+        }
+        if self.generated_date is not None:
+            data['generated_date'] = self.generated_date
+        return data
+
+    def to_schedule_dict(self):
+        """
+        Serialize to the study_plan_logic shape: {week: {day: [hour slots]}}
+        """
+        return {
+            week.name: {day.name: [slot.to_dict() for slot in day.slots] for day in week.days}
+            for week in self.weeks
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a model from a /generate-plan JSON plan
+
+        Repeated day schedules (shared lists, or equal to a recently seen
+        one) are collapsed onto one shared slots tuple, so exporters can
+        format each distinct template once.
+        """
+        by_identity = {}
+        # Most recent distinct schedules as (activities list, slots); bounded
+        # so plans with all-different days stay linear
+        templates = deque(maxlen=8)
+
+        def shared_slots(activities):
+            slots = by_identity.get(id(activities))
+            if slots is None:
+                for seen, seen_slots in templates:
+                    if activities == seen:
+                        slots = seen_slots
+                        break
+                else:
+                    slots = tuple(Slot.from_dict(a) for a in activities)
+                    templates.append((activities, slots))
+                by_identity[id(activities)] = slots
+            return slots
+
+        weeks = []
+        for week_name, details in data['weekly_plan'].items():
+            days = tuple(Day(day, shared_slots(activities))
+                         for day, activities in details['daily_schedule'].items())
+            weeks.append(Week(week_name, days, details.get('focus'),
+                              details.get('goals'), details.get('resources')))
+
+        return cls(
+            weeks,
+            current_score=data.get('current_score'),
+            target_score=data.get('target_score'),
+            test_type=data.get('test_type'),
+            duration=data.get('duration'),
+            hours_daily=data.get('hours_daily'),
+            intensity=data.get('intensity'),
+            generated_date=data.get('generated_date')
+        )
+
+
+def schedule_dict(days, memo=None):
+    """
+    Serialize days to a daily_schedule dict
+
+    Calls with the same memo return one dict per days tuple, and days
+    sharing a slots tuple share one list of slot dicts.
+    """
+    memo = {} if memo is None else memo
+    schedule = memo.get(id(days))
+    if schedule is None:
+        schedule = {}
+        for day in days:
+            activities = memo.get(id(day.slots))
+            if activities is None:
+                activities = memo[id(day.slots)] = [slot.to_dict() for slot in day.slots]
+            schedule[day.name] = activities
+        memo[id(days)] = schedule
+    return schedule
+
+
+def as_plan_model(plan):
+    """Return plan as a Plan, converting from the JSON dict shape if needed"""
+    return plan if isinstance(plan, Plan) else Plan.from_dict(plan)
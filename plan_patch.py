@@ -0,0 +1,146 @@
+"""
+Incremental plan regeneration
+
+regenerate_plan() takes a generated plan and changed planner inputs,
+recomputes only the parts those inputs affect and returns the new plan
+with a JSON Patch (RFC 6902) that turns the old plan into it:
+
+    scores       intensity, and goals when target_score changes
+    hours_daily  the day template (also test_type)
+    num_weeks    focus phases of the kept weeks, plus added/removed weeks
+
+Unchanged weeks are shared with the old plan, not copied. A day template
+or goals list that changes in every week is sent once and then copied
+from the first week's path, and added weeks copy what they share with
+Week 1.
+"""
+from plan_model import Week
+from planner import (
+    build_day_template, build_week, current_timestamp, get_intensity, get_score_gap,
+    get_week_focus, get_weekly_goals, normalize_plan_inputs
+)
+
+# Planner inputs in normalize_plan_inputs() order
+PLAN_PARAMS = ('current_score', 'target_score', 'hours_daily', 'test_type', 'num_weeks')
+
+
+def json_pointer(*tokens):
+    """Build a JSON Pointer (RFC 6901) from unescaped path tokens"""
+    return ''.join('/' + str(token).replace('~', '~0').replace('/', '~1') for token in tokens)
+
+
+def plan_params(plan):
+    """Return the normalized planner inputs a plan dict was generated from"""
+    return normalize_plan_inputs(
+        plan['current_score'], plan['target_score'], plan['hours_daily'],
+        plan['test_type'], len(plan['weekly_plan'])
+    )
+
+
+def regenerate_plan(plan, changes):
+    """
+    Apply changed planner inputs to a plan dict
+
+    changes maps names from PLAN_PARAMS to new values; other inputs keep
+    the plan's values. Returns (new_plan, patch). The old plan is not
+    modified; with no effective change the patch is empty and the old plan
+    is returned.
+    """
+    old_params = plan_params(plan)
+    params = normalize_plan_inputs(*(
+        changes.get(name, value) for name, value in zip(PLAN_PARAMS, old_params)
+    ))
+    if params == old_params:
+        return plan, []
+
+    old = dict(zip(PLAN_PARAMS, old_params))
+    current_score, target_score, hours_daily, test_type, num_weeks = params
+    score_gap = get_score_gap(current_score, target_score)
+    intensity = get_intensity(score_gap)
+
+    new_plan = dict(plan)
+    patch = []
+
+    # Plan overview
+    overview = {
+        'current_score': current_score,
+        'target_score': target_score,
+        'test_type': test_type,
+        'duration': f"{num_weeks} weeks",
+        'hours_daily': hours_daily,
+        'intensity': intensity
+    }
+    for key, value in overview.items():
+        if plan.get(key) != value:
+            op = 'replace' if key in plan else 'add'
+            patch.append({'op': op, 'path': json_pointer(key), 'value': value})
+            new_plan[key] = value
+
+    # Only rebuild what the changed inputs feed into
+    days = None
+    schedule = None
+    if hours_daily != old['hours_daily'] or test_type != old['test_type']:
+        days = build_day_template(hours_daily, test_type)
+        schedule = Week(None, days).to_dict()['daily_schedule']
+    goals = None
+    if target_score != old['target_score']:
+        goals = get_weekly_goals(None, target_score)
+
+    weekly_plan = dict(plan['weekly_plan'])
+    first_path = {}  # field -> path of its first patched copy
+    for week in range(1, min(num_weeks, old['num_weeks']) + 1):
+        name = f'Week {week}'
+        details = weekly_plan[name]
+        updates = {}
+        if num_weeks != old['num_weeks']:
+            focus = get_week_focus(week, num_weeks, score_gap)
+            if focus != details['focus']:
+                updates['focus'] = focus
+        if schedule is not None:
+            updates['daily_schedule'] = schedule
+        if goals is not None:
+            updates['goals'] = goals
+
+        for field, value in updates.items():
+            path = json_pointer('weekly_plan', name, field)
+            if field in first_path:
+                patch.append({'op': 'copy', 'from': first_path[field], 'path': path})
+            else:
+                patch.append({'op': 'replace', 'path': path, 'value': value})
+                if field != 'focus':
+                    first_path[field] = path
+        if updates:
+            weekly_plan[name] = dict(details, **updates)
+
+    # Trim from the end, then append new weeks
+    for week in range(old['num_weeks'], num_weeks, -1):
+        name = f'Week {week}'
+        patch.append({'op': 'remove', 'path': json_pointer('weekly_plan', name)})
+        del weekly_plan[name]
+    if num_weeks > old['num_weeks']:
+        days = days or build_day_template(hours_daily, test_type)
+        memo = {}
+        source = weekly_plan.get('Week 1')
+        for week in range(old['num_weeks'] + 1, num_weeks + 1):
+            details = build_week(week, num_weeks, score_gap, target_score, days).to_dict(memo)
+            name = f'Week {week}'
+            # Fields equal to Week 1's are copied instead of resent
+            value, copied = {}, []
+            for field, field_value in details.items():
+                if field != 'focus' and source is not None and source.get(field) == field_value:
+                    copied.append(field)
+                else:
+                    value[field] = field_value
+            patch.append({'op': 'add', 'path': json_pointer('weekly_plan', name), 'value': value})
+            for field in copied:
+                patch.append({'op': 'copy', 'from': json_pointer('weekly_plan', 'Week 1', field),
+                              'path': json_pointer('weekly_plan', name, field)})
+            weekly_plan[name] = details
+    new_plan['weekly_plan'] = weekly_plan
+
+    # Keep generated_date last, as in freshly generated plans
+    new_plan.pop('generated_date', None)
+    new_plan['generated_date'] = current_timestamp()
+    patch.append({'op': 'add', 'path': '/generated_date', 'value': new_plan['generated_date']})
+
+    return new_plan, patch
@@ -0,0 +1,129 @@
+"""
+Server-side storage for generated study plans
+
+Plans are saved under a random plan ID when they are generated so that the
+export endpoints can fetch them by ID instead of having the browser upload
+the whole plan again. The backend is chosen with the PLAN_STORE setting:
+
+    memory                     per-worker LRU (default)
+    sqlite:///path/plans.db    SQLite file shared by all workers on a host
+"""
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+from plan_cache import PlanCache
+from plan_compact import compact_plan, expand_plan
+from planner import LazyPlan
+from sqlite_connections import SQLiteConnections
+
+
+def new_plan_id():
+    """Return a fresh, URL-safe plan ID"""
+    return uuid.uuid4().hex
+
+
+class PlanStore(ABC):
+    """
+    Interface shared by all plan store backends
+    """
+
+    @abstractmethod
+    def save(self, plan):
+        """Store plan and return its new plan ID"""
+
+    @abstractmethod
+    def get(self, plan_id):
+        """
+        Return the stored plan (a plan dict or a LazyPlan), or None if it
+        is unknown or expired
+        """
+
+
+class MemoryPlanStore(PlanStore):
+    """
+    In-process LRU store; plans are kept as-is (sharing cached templates)
+    """
+
+    def __init__(self, max_entries=1024, ttl=86400):
+        self._cache = PlanCache(max_entries, ttl)
+
+    def save(self, plan):
+        plan_id = new_plan_id()
+        self._cache.set(plan_id, plan)
+        return plan_id
+
+    def get(self, plan_id):
+        return self._cache.get(plan_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class SQLitePlanStore(PlanStore):
+    """
+    SQLite-backed store; plans are saved in the compact format and lazy
+    plans as their input parameters
+    """
+
+    def __init__(self, path, ttl=86400):
+        self.path = path
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._connect = SQLiteConnections(path).connect
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS plans ('
+                ' plan_id TEXT PRIMARY KEY,'
+                ' created_at REAL NOT NULL,'
+                ' body TEXT NOT NULL)'
+            )
+            # Every insert deletes expired rows by created_at
+            conn.execute('CREATE INDEX IF NOT EXISTS plans_created_at ON plans (created_at)')
+
+    def save(self, plan):
+        plan_id = new_plan_id()
+        if isinstance(plan, LazyPlan):
+            record = {'format': 'lazy', 'params': list(plan.params),
+                      'generated_date': plan.generated_date}
+        else:
+            record = compact_plan(plan)
+        body = json.dumps(record, separators=(',', ':'))
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO plans (plan_id, created_at, body) VALUES (?, ?, ?)',
+                (plan_id, now, body)
+            )
+            if self.ttl is not None:
+                conn.execute('DELETE FROM plans WHERE created_at < ?', (now - self.ttl,))
+        return plan_id
+
+    def get(self, plan_id):
+        row = self._connect().execute(
+            'SELECT created_at, body FROM plans WHERE plan_id = ?', (plan_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        created_at, body = row
+        if self.ttl is not None and time.time() - created_at > self.ttl:
+            return None
+        record = json.loads(body)
+        if record.get('format') == 'lazy':
+            return LazyPlan(*record['params'], generated_date=record['generated_date'])
+        return expand_plan(record)
+
+    def stats(self):
+        (count,) = self._connect().execute('SELECT COUNT(*) FROM plans').fetchone()
+        return {'size': count, 'ttl': self.ttl}
+
+
+def create_plan_store(url, max_entries=1024, ttl=86400):
+    """
+    Build a plan store from a PLAN_STORE setting
+    """
+    if not url or url == 'memory':
+        return MemoryPlanStore(max_entries, ttl)
+    if url.startswith('sqlite:///'):
+        return SQLitePlanStore(url[len('sqlite:///'):], ttl)
+    raise ValueError(f"Unsupported PLAN_STORE: {url}")
@@ -0,0 +1,298 @@
+"""
+Study plan generation logic
+"""
+import functools
+from datetime import datetime
+
+import config
+from fast_json import fragments
+from metrics import phase
+from plan_cache import PlanCache
+from plan_model import Day, Slot, Week, schedule_dict
+
+# Plan bodies are identical for identical inputs, so they are built once
+# and only stamped with a fresh generated_date per request
+plan_cache = PlanCache(config.PLAN_CACHE_SIZE, config.PLAN_CACHE_TTL)
+
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Share of daily study time per skill
+SKILL_ALLOCATION = {'listening': 0.25, 'reading': 0.25, 'writing': 0.30, 'speaking': 0.20}
+
+# Base activities by skill
+BASE_ACTIVITIES = {
+    'listening': [
+        'Practice with real IELTS listening tests',
+        'Focus on identifying key information and details',
+        'Listen to English podcasts and audio recordings'
+    ],
+    'reading': [
+        'Practice IELTS reading passages with time limits',
+        'Work on skimming and scanning techniques',
+        'Build academic vocabulary'
+    ],
+    'writing': [
+        'Practice Task 1 and Task 2 essay writing',
+        'Focus on structure and coherence',
+        'Build vocabulary for academic writing'
+    ],
+    'speaking': [
+        'Practice speaking on various topics',
+        'Record yourself and analyze fluency',
+        'Work on pronunciation and intonation'
+    ]
+}
+
+# Resources attached to every week (shared, read-only)
+WEEKLY_RESOURCES = {
+    'sparkskytech': [
+        'https://www.sparkskytech.com/ielts',
+        'https://www.sparkskytech.com/ielts/ielts_free_resources'
+    ],
+    'official': [
+        'https://www.ielts.org/',
+        'https://takeielts.britishcouncil.org/'
+    ],
+    'practice': [
+        'https://www.ieltsonlinetests.com/',
+        'https://ieltsliz.com/'
+    ]
+}
+fragments.share(WEEKLY_RESOURCES)
+
+
+def normalize_plan_inputs(current_score, target_score, hours_daily, test_type, num_weeks):
+    """
+    Normalize planner inputs into the tuple used as the plan cache key
+    """
+    def clean(value):
+        return value.strip() if isinstance(value, str) else value
+
+    return (
+        clean(current_score),
+        clean(target_score),
+        clean(hours_daily),
+        clean(test_type),
+        int(num_weeks)
+    )
+
+
+def generate_study_plan(current_score, target_score, hours_daily, test_type, num_weeks):
+    """
+    Generate a personalized weekly study plan
+
+    The plan body is served from plan_cache and must not be mutated;
+    only generated_date is set on the returned copy.
+    """
+    params = normalize_plan_inputs(current_score, target_score, hours_daily, test_type, num_weeks)
+    # Plans echo the inputs back, and equal values of different types
+    # (5, 5.0 and '5'; 1 and True) are echoed differently
+    key = params + tuple(type(value) for value in params)
+    def build():
+        with phase('plan_build'):
+            body = build_plan_body(*params)
+        # Cached bodies are read-only, so their weeks' JSON can be reused
+        fragments.share(body['weekly_plan'])
+        return body
+
+    body = plan_cache.get_or_create(key, build)
+    plan = dict(body)
+    plan['generated_date'] = current_timestamp()
+    return plan
+
+
+def current_timestamp():
+    """Return the generated_date stamp for a new plan"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_score_gap(current_score, target_score):
+    return float(target_score) - float(current_score)
+
+
+def get_intensity(score_gap):
+    return "High" if score_gap > 1.5 else "Medium" if score_gap > 0.5 else "Low"
+
+
+# Weekly focus logic
+def get_week_focus(week, total_weeks, score_gap):
+    if week <= total_weeks // 3:
+        return "Foundation Building"
+    elif week <= 2 * total_weeks // 3:
+        return "Skill Development"
+    else:
+        return "Test Preparation & Practice"
+
+
+# Daily schedule generator
+@functools.lru_cache(maxsize=256)
+def build_day_template(hours_daily, test_type):
+    """
+    Build the days of a study week; every day shares one slots tuple
+
+    Templates are cached and shared read-only by every plan (and, when the
+    app is preloaded, by every worker).
+    """
+    hours = int(hours_daily)
+
+    slots = []
+    for skill, ratio in SKILL_ALLOCATION.items():
+        time_allocated = int(hours * ratio * 60)  # minutes
+        if time_allocated > 0:
+            slots.append(Slot(
+                skill.title(),
+                f"{time_allocated} minutes",
+                tuple(get_skill_activities(skill, test_type, time_allocated))
+            ))
+    slots = tuple(slots)
+
+    return tuple(Day(day, slots) for day in DAYS_OF_WEEK)
+
+
+def get_skill_activities(skill, test_type, duration_minutes):
+    activities = {
+        'listening': [
+            'Listen to IELTS practice tests',
+            'Practice with academic lectures' if test_type == 'academic' else 'Practice with everyday conversations',
+            'Focus on identifying main ideas and details'
+        ],
+        'reading': [
+            'Complete IELTS reading passages',
+            'Practice academic texts' if test_type == 'academic' else 'Practice general interest articles',
+            'Work on time management'
+        ],
+        'writing': [
+            'Practice Task 1 (graphs/charts)' if test_type == 'academic' else 'Practice Task 1 (letters)',
+            'Practice Task 2 essay writing',
+            'Focus on structure and linking words'
+        ],
+        'speaking': [
+            'Practice Part 1 personal questions',
+            'Work on Part 2 cue card topics',
+            'Practice Part 3 discussion questions'
+        ]
+    }
+    return activities.get(skill, [])
+
+
+def get_weekly_goals(week, target_score):
+    return [
+        f"Maintain consistent daily study routine",
+        f"Complete all scheduled practice activities",
+        f"Track progress towards {target_score} target",
+        f"Review and identify areas for improvement"
+    ]
+
+
+def build_week(week, num_weeks, score_gap, target_score, days):
+    """
+    Build one week; the days template is shared, not copied
+    """
+    return Week(
+        f'Week {week}',
+        days,
+        focus=get_week_focus(week, num_weeks, score_gap),
+        goals=get_weekly_goals(week, target_score),
+        resources=WEEKLY_RESOURCES
+    )
+
+
+def build_plan_body(current_score, target_score, hours_daily, test_type, num_weeks):
+    """
+    Build the plan body (everything except generated_date)
+
+    The body is cached and treated as read-only; every week shares one
+    daily_schedule dict and the resources list.
+    """
+    # Calculate intensity
+    score_gap = get_score_gap(current_score, target_score)
+    intensity = get_intensity(score_gap)
+
+    # Weeks only differ in focus and goals; the days and resources are
+    # shared templates
+    daily_schedule = schedule_dict(build_day_template(hours_daily, test_type))
+
+    # Generate full plan
+    weekly_plan = {}
+    for week in range(1, num_weeks + 1):
+        weekly_plan[f'Week {week}'] = {
+            'focus': get_week_focus(week, num_weeks, score_gap),
+            'daily_schedule': daily_schedule,
+            'goals': get_weekly_goals(week, target_score),
+            'resources': WEEKLY_RESOURCES
+        }
+
+    return {
+        'current_score': current_score,
+        'target_score': target_score,
+        'test_type': test_type,
+        'duration': f"{num_weeks} weeks",
+        'hours_daily': hours_daily,
+        'intensity': intensity,
+        'weekly_plan': weekly_plan
+    }
+
+
+class LazyPlan:
+    """
+    Study plan whose weeks are only built when they are requested
+
+    Creating one costs the same for 1 or 52 weeks; to_dict() produces the
+    same plan as generate_study_plan().
+    """
+
+    def __init__(self, current_score, target_score, hours_daily, test_type, num_weeks,
+                 generated_date=None):
+        self.params = normalize_plan_inputs(
+            current_score, target_score, hours_daily, test_type, num_weeks
+        )
+        (self.current_score, self.target_score, self.hours_daily,
+         self.test_type, self.num_weeks) = self.params
+        self.score_gap = get_score_gap(self.current_score, self.target_score)
+        self.intensity = get_intensity(self.score_gap)
+        self.generated_date = generated_date or current_timestamp()
+        self._days = None
+        # Serialized day templates, shared by every week this plan returns
+        self._memo = {}
+
+    def __len__(self):
+        return self.num_weeks
+
+    @property
+    def days(self):
+        if self._days is None:
+            self._days = build_day_template(self.hours_daily, self.test_type)
+        return self._days
+
+    def week(self, week):
+        """Build the entry for a 1-based week number"""
+        if not 1 <= week <= self.num_weeks:
+            raise IndexError(f"Week {week} is outside this {self.num_weeks}-week plan")
+        return build_week(week, self.num_weeks, self.score_gap, self.target_score,
+                          self.days).to_dict(self._memo)
+
+    def weeks(self, offset=0, limit=None):
+        """Return {'Week N': entry} for weeks offset+1 .. offset+limit"""
+        start = max(0, offset) + 1
+        stop = self.num_weeks if limit is None else min(self.num_weeks, start + limit - 1)
+        return {f'Week {week}': self.week(week) for week in range(start, stop + 1)}
+
+    def summary(self):
+        """Plan overview fields without weekly_plan"""
+        return {
+            'current_score': self.current_score,
+            'target_score': self.target_score,
+            'test_type': self.test_type,
+            'duration': f"{self.num_weeks} weeks",
+            'hours_daily': self.hours_daily,
+            'intensity': self.intensity,
+            'generated_date': self.generated_date
+        }
+
+    def to_dict(self):
+        """Materialize the full plan"""
+        plan = self.summary()
+        del plan['generated_date']
+        plan['weekly_plan'] = self.weeks()
+        plan['generated_date'] = self.generated_date
+        return plan
@@ -0,0 +1,186 @@
+"""
+Opt-in profiling of production requests
+
+A request is profiled when it is the Nth since the last sampled one
+(PROFILE_SAMPLE_RATE) or when it sends X-Profile: 1 together with the
+admin token in X-Admin-Token. Two profilers are available (PROFILE_MODE):
+
+    cprofile    deterministic, written as a pstats file (.prof) for
+                pstats / snakeviz
+    sample      a thread samples the request thread's stack every
+                PROFILE_SAMPLE_INTERVAL seconds; written as collapsed
+                stacks (.collapsed) for flamegraph.pl / speedscope
+
+Files go to PROFILE_DIR; only the newest PROFILE_MAX_FILES are kept. When
+neither a sample rate nor an admin token is configured, no profiler is
+created and requests only pay for one None check.
+"""
+import cProfile
+import hmac
+import itertools
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+PROFILE_SUFFIXES = {'cprofile': '.prof', 'sample': '.collapsed'}
+
+# Profile file names as written by RequestProfiler (also the download whitelist)
+PROFILE_NAME = re.compile(r'^[\w.-]+\.(prof|collapsed)$')
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack from a background thread
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.started = time.perf_counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CProfileSession:
+    """
+    cProfile of the current thread
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.started = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path):
+        self.profile.dump_stats(path)
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and keeps the profile directory
+    """
+
+    def __init__(self, directory, sample_rate=0, admin_token='', max_files=100,
+                 mode='cprofile', interval=0.005):
+        if mode not in PROFILE_SUFFIXES:
+            raise ValueError(f"Unsupported PROFILE_MODE: {mode}")
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self.max_files = max(1, max_files)
+        self.mode = mode
+        self.interval = interval
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def is_admin(self, headers):
+        """True if the request carries the admin token"""
+        token = headers.get('X-Admin-Token', '')
+        return bool(self.admin_token) and hmac.compare_digest(
+            token.encode('utf-8'), self.admin_token.encode('utf-8')
+        )
+
+    def wants(self, headers):
+        """Whether to profile a request with these headers"""
+        if headers.get('X-Profile') == '1' and self.is_admin(headers):
+            return True
+        return self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0
+
+    def start(self):
+        """Start profiling the current thread; returns the session"""
+        if self.mode == 'sample':
+            return StackSampler(threading.get_ident(), self.interval)
+        return CProfileSession()
+
+    def finish(self, session, label):
+        """
+        Stop a session and write its profile; returns the file name
+
+        label (e.g. the route) and the elapsed time go into the name, so
+        slow requests stand out in the listing.
+        """
+        session.stop()
+        elapsed = time.perf_counter() - session.started
+        slug = re.sub(r'[^\w-]+', '_', label).strip('_') or 'request'
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        name = f"{stamp}_{slug}_{elapsed * 1000:.0f}ms_{os.getpid()}{PROFILE_SUFFIXES[self.mode]}"
+        path = os.path.join(self.directory, name)
+        # Write then rename so the listing never shows a partial file
+        temp_path = f"{path}.tmp"
+        session.write(temp_path)
+        os.replace(temp_path, path)
+        self._rotate()
+        return name
+
+    def _rotate(self):
+        with self._lock:
+            profiles = self.list_profiles()
+            for profile in profiles[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, profile['name']))
+                except OSError:
+                    pass
+
+    def list_profiles(self):
+        """Profile files, newest first, as dicts of name, size and created"""
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if not PROFILE_NAME.match(entry.name):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:  # removed by another worker's rotation
+                continue
+            profiles.append({'name': entry.name, 'size': stat.st_size,
+                             'created': stat.st_mtime})
+        profiles.sort(key=lambda profile: profile['created'], reverse=True)
+        return profiles
+
+    def profile_path(self, name):
+        """Path of a profile file, or None for unknown or unsafe names"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+def create_request_profiler(directory, sample_rate, admin_token, max_files, mode, interval):
+    """
+    Build the request profiler from the PROFILE_* settings, or None when
+    profiling is off
+    """
+    if sample_rate <= 0 and not admin_token:
+        return None
+    directory = directory or os.path.join(tempfile.gettempdir(), 'ielts-profiles')
+    return RequestProfiler(directory, sample_rate, admin_token, max_files, mode, interval)
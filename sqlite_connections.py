@@ -0,0 +1,31 @@
+"""
+Per-thread SQLite connections for the SQLite store backends
+"""
+import os
+import sqlite3
+import threading
+
+
+class SQLiteConnections:
+    """
+    Opens one connection to a database file per thread and process
+
+    sqlite3 connections must not be shared across threads, nor with
+    worker processes forked after the store was created (--preload).
+    The file's directory is created if needed.
+    """
+
+    def __init__(self, path, timeout=10):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def connect(self):
+        """Return the calling thread's connection, opening it if needed"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -1,3 +1,167 @@
+import itertools
+from types import MappingProxyType
+
+from plan_model import Day, HourSlot, Plan, Week
+
+# Task and resource catalogs are built once at import and shared read-only
+# by every generated plan.
+
+# Define task pools by section
+READING_TASKS = (
+    "Reading practice",
+    "Skim & scan articles",
+    "Time yourself with real tests",
+    "Learn academic vocabulary",
+    "Improve speed-reading",
+)
+LISTENING_TASKS = (
+    "Listening practice",
+    "Dictation exercises",
+    "Note-taking from lectures",
+    "Identify speaker intent",
+    "Practice accents (UK/US/AU)",
+)
+WRITING_TASKS_ACADEMIC = (
+    "Writing Task 1 (Graph/Table)",
+    "Writing Task 2 (Essay)",
+    "Analyze model answers",
+    "Grammar & coherence focus",
+    "Write under timed conditions",
+)
+WRITING_TASKS_GENERAL = (
+    "Writing Task 1 (Letter)",
+    "Writing Task 2 (Essay)",
+    "Formal vs informal tone",
+    "Structure practice",
+    "Improve clarity & cohesion",
+)
+SPEAKING_TASKS = (
+    "Speaking Part 1 practice",
+    "Speaking Part 2 cue cards",
+    "Speaking Part 3 discussion",
+    "Record & self-review",
+    "Improve fluency & pronunciation",
+)
+GENERAL_TASKS = (
+    "Vocabulary building",
+    "Grammar review",
+    "Mock test & review",
+    "Test strategy review",
+    "Feedback analysis"
+)
+
+# Full task pool per test format
+TASK_POOLS = MappingProxyType({
+    "Academic": (READING_TASKS[:3] + LISTENING_TASKS[:3] + WRITING_TASKS_ACADEMIC[:3]
+                 + SPEAKING_TASKS + GENERAL_TASKS),
+    "General Training": (READING_TASKS[2:] + LISTENING_TASKS[2:] + WRITING_TASKS_GENERAL[:3]
+                         + SPEAKING_TASKS + GENERAL_TASKS),
+})
+
+# Map each task to one or more high-quality resources
+RESOURCES = MappingProxyType({
+    "Reading practice": (
+        "Cambridge IELTS Official Practice Tests",
+        "British Council Reading sample tasks"
+    ),
+    "Skim & scan articles": (
+        "BBC Learning English",
+        "The Guardian Online Articles"
+    ),
+    "Time yourself with real tests": (
+        "IELTS Liz Listening lessons",
+        "Official IELTS Listening on IDP website"
+    ),
+    "Writing Task 1 (Graph/Table)": (
+        "Cambridge IELTS Writing Model Answers",
+        "IELTS Simon Task 1 explanations"
+    ),
+    "Writing Task 2 (Essay)": (
+        "IELTS Advantage Writing Task 2 guide",
+        "British Council Writing samples"
+    ),
+    "Speaking Part 1 practice": (
+        "IELTS Speaking part 1 questions",
+        "YouTube mock interviews"
+    ),
+    "Speaking Part 2 cue cards": (
+        "IELTS Speaking part 2 cue-card exercises",
+        "British Council Speaking sample videos"
+    ),
+    "Speaking Part 3 discussion": (
+        "Topic-based discussions",
+        "IELTS Speaking Band Descriptors"
+    ),
+    "Vocabulary building": (
+        "Academic Word List flashcards (Anki deck)",
+        "IELTS Vocabulary by Cambridge"
+    ),
+    "Grammar review": (
+        "English Grammar in Use (Murphy)",
+        "Cambridge Grammar for IELTS"
+    ),
+    "Mock test & review": (
+        "Full practice test from Cambridge IELTS series",
+        "Record yourself & self-evaluate with official band descriptors"
+    ),
+    "Test strategy review": (
+        "IELTS Official Guide",
+        "IELTS Liz Strategy Videos"
+    ),
+    "Feedback analysis": (
+        "Review past test results",
+        "Track weak areas weekly"
+    )
+})
+NO_SPECIFIC_RESOURCES = ("No specific resources",)
+
+DAYS_OF_WEEK = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def cycle_tasks(test_format: str):
+    """
+    Repeating cycle of the tasks for a test format
+
+    Cycled lazily, so memory does not grow with the plan length.
+    """
+    return itertools.cycle(TASK_POOLS["Academic"] if test_format == "Academic"
+                           else TASK_POOLS["General Training"])
+
+
+def build_study_plan(
+    test_format: str,
+    current_score: float,
+    target_score: float,
+    daily_hours: int,
+    total_weeks: int
+) -> Plan:
+    """
+    Build an IELTS study plan as a Plan model of HourSlot days.
+
+    Takes the same arguments as generate_study_plan(), which builds the
+    same plan as nested dicts.
+    """
+    task_cycle = cycle_tasks(test_format)
+
+    # Build the plan model
+    weeks = []
+    for week_index in range(1, total_weeks + 1):
+        days = []
+        for day in DAYS_OF_WEEK:
+            hourly_plan = []
+            for hour_slot in range(1, daily_hours + 1):
+                try:
+                    task = next(task_cycle)
+                except StopIteration:
+                    task = "Review previous day's material"
+                hourly_plan.append(HourSlot(hour_slot, task, RESOURCES.get(task, NO_SPECIFIC_RESOURCES)))
+            days.append(Day(day, tuple(hourly_plan)))
+        weeks.append(Week(f"Week {week_index}", tuple(days)))
+
+    return Plan(weeks, current_score=current_score, target_score=target_score,
+                test_type=test_format, hours_daily=daily_hours)
+
+
 def generate_study_plan(
     test_format: str,
     current_score: float,
@@ -17,125 +181,17 @@ def generate_study_plan(
 
     Returns:
         dict: nested dict { 'Week 1': { 'Monday': [ {Hour, Task, Resources}, ... ], ... }, ... }
+        Resources are shared, read-only tuples from RESOURCES.
     """
-    # Define task pools by section
-    reading_tasks = [
-        "Reading practice",
-        "Skim & scan articles",
-        "Time yourself with real tests",
-        "Learn academic vocabulary",
-        "Improve speed-reading",
-    ]
-    listening_tasks = [
-        "Listening practice",
-        "Dictation exercises",
-        "Note-taking from lectures",
-        "Identify speaker intent",
-        "Practice accents (UK/US/AU)",
-    ]
-    writing_tasks_academic = [
-        "Writing Task 1 (Graph/Table)",
-        "Writing Task 2 (Essay)",
-        "Analyze model answers",
-        "Grammar & coherence focus",
-        "Write under timed conditions",
-    ]
-    writing_tasks_general = [
-        "Writing Task 1 (Letter)",
-        "Writing Task 2 (Essay)",
-        "Formal vs informal tone",
-        "Structure practice",
-        "Improve clarity & cohesion",
-    ]
-    speaking_tasks = [
-        "Speaking Part 1 practice",
-        "Speaking Part 2 cue cards",
-        "Speaking Part 3 discussion",
-        "Record & self-review",
-        "Improve fluency & pronunciation",
-    ]
-    general_tasks = [
-        "Vocabulary building",
-        "Grammar review",
-        "Mock test & review",
-        "Test strategy review",
-        "Feedback analysis"
-    ]
-
-    # Build full task pool based on test format
-    tasks = []
-    if test_format == "Academic":
-        tasks += reading_tasks[:3] + listening_tasks[:3] + writing_tasks_academic[:3]
-    else:
-        tasks += reading_tasks[2:] + listening_tasks[2:] + writing_tasks_general[:3]
-    tasks += speaking_tasks + general_tasks
-
-    # Map each task to one or more high-quality resources
-    resources = {
-        "Reading practice": [
-            "Cambridge IELTS Official Practice Tests",
-            "British Council Reading sample tasks"
-        ],
-        "Skim & scan articles": [
-            "BBC Learning English",
-            "The Guardian Online Articles"
-        ],
-        "Time yourself with real tests": [
-            "IELTS Liz Listening lessons",
-            "Official IELTS Listening on IDP website"
-        ],
-        "Writing Task 1 (Graph/Table)": [
-            "Cambridge IELTS Writing Model Answers",
-            "IELTS Simon Task 1 explanations"
-        ],
-        "Writing Task 2 (Essay)": [
-            "IELTS Advantage Writing Task 2 guide",
-            "British Council Writing samples"
-        ],
-        "Speaking Part 1 practice": [
-            "IELTS Speaking part 1 questions",
-            "YouTube mock interviews"
-        ],
-        "Speaking Part 2 cue cards": [
-            "IELTS Speaking part 2 cue-card exercises",
-            "British Council Speaking sample videos"
-        ],
-        "Speaking Part 3 discussion": [
-            "Topic-based discussions",
-            "IELTS Speaking Band Descriptors"
-        ],
-        "Vocabulary building": [
-            "Academic Word List flashcards (Anki deck)",
-            "IELTS Vocabulary by Cambridge"
-        ],
-        "Grammar review": [
-            "English Grammar in Use (Murphy)",
-            "Cambridge Grammar for IELTS"
-        ],
-        "Mock test & review": [
-            "Full practice test from Cambridge IELTS series",
-            "Record yourself & self-evaluate with official band descriptors"
-        ],
-        "Test strategy review": [
-            "IELTS Official Guide",
-            "IELTS Liz Strategy Videos"
-        ],
-        "Feedback analysis": [
-            "Review past test results",
-            "Track weak areas weekly"
-        ]
-    }
-
-    # Prepare day names and a repeating cycle of tasks
-    days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    task_cycle = iter(tasks * (daily_hours * total_weeks * len(days_of_week)))
-
-    # Build the nested plan structure
+    task_cycle = cycle_tasks(test_format)
+
+    # Build the nested plan structure directly; converting the model would
+    # build every slot twice
     plan = {}
     for week_index in range(1, total_weeks + 1):
         week_key = f"Week {week_index}"
         plan[week_key] = {}
-        for day in days_of_week:
+        for day in DAYS_OF_WEEK:
             hourly_plan = []
             for hour_slot in range(1, daily_hours + 1):
                 try:
@@ -145,8 +201,8 @@ def generate_study_plan(
                 hourly_plan.append({
                     "Hour": hour_slot,
                     "Task": task,
-                    "Resources": resources.get(task, ["No specific resources"])
+                    "Resources": RESOURCES.get(task, NO_SPECIFIC_RESOURCES)
                 })
             plan[week_key][day] = hourly_plan
 
-    return plan
\ No newline at end of file
+    return plan